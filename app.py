@@ -1,10 +1,7 @@
 # app.py
 import streamlit as st
 
-st.set_page_config(page_title="🛰️ Command Station", page_icon="🛰️", layout="wide")
-
-st.title("🛰️ Command Station")
-st.markdown("""
+README_MD = """
 社内サーバやローカルマシン上のコマンド実行・状態確認を行うためのツールです。  
 安全に実行できる範囲に限定し、出力はWeb上で確認できます。
 
@@ -96,5 +93,9 @@ headless = true
     1. 「python仮想環境構築」より仮想環境を構築し，ライブラリーのインポートなどを行う．
             
     1. secrets.tomlの作成と設定
-""")
+"""
 
+st.set_page_config(page_title="🛰️ Command Station", page_icon="🛰️", layout="wide")
+
+st.title("🛰️ Command Station")
+st.markdown(README_MD)
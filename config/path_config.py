@@ -1,9 +1,12 @@
 # config/path_config.py
 from __future__ import annotations
+import copy
 from pathlib import Path
+from types import ModuleType
 import os
-import tomllib
-from typing import Optional, Dict, Any
+from typing import Optional
+
+from lib.toml_cache import load_toml
 
 # このファイルの位置 … <app_root>/config/path_config.py
 APP_ROOT = Path(__file__).resolve().parents[1]
@@ -12,12 +15,20 @@ APP_ROOT = Path(__file__).resolve().parents[1]
 # ------------------------------------------------------------
 # 内部ユーティリティ
 # ------------------------------------------------------------
+# (APP_SETTINGS_FILE の値, 候補パス) … 環境変数が変わらない限り使い回す
+_CANDIDATE_PATHS: Optional[tuple[Optional[str], list[Path]]] = None
+
+
 def _candidate_paths() -> list[Path]:
-    """settings.toml を探す候補パスを優先順で返す。"""
-    paths: list[Path] = []
+    """settings.toml を探す候補パスを優先順で返す（APP_SETTINGS_FILE が変わるまでキャッシュ）。"""
+    global _CANDIDATE_PATHS
 
     # 1) 環境変数で明示指定（最優先）
     env_path = os.getenv("APP_SETTINGS_FILE")
+    if _CANDIDATE_PATHS is not None and _CANDIDATE_PATHS[0] == env_path:
+        return _CANDIDATE_PATHS[1]
+
+    paths: list[Path] = []
     if env_path:
         paths.append(Path(env_path).expanduser())
 
@@ -30,12 +41,20 @@ def _candidate_paths() -> list[Path]:
     # 4) config/ 配下（保険）
     paths.append(APP_ROOT / "config" / "settings.toml")
 
+    _CANDIDATE_PATHS = (env_path, paths)
     return paths
 
 
-def _load_toml(path: Path) -> Dict[str, Any]:
-    with open(path, "rb") as f:
-        return tomllib.load(f)
+_st_mod: Optional[ModuleType] = None
+
+
+def _streamlit() -> ModuleType:
+    """streamlit を初回だけ import し、以降はモジュール参照を使い回す。"""
+    global _st_mod
+    if _st_mod is None:
+        import streamlit as st  # 遅延インポート（未導入環境に配慮）
+        _st_mod = st
+    return _st_mod
 
 
 def _read_location_from_secrets() -> Optional[str]:
@@ -45,7 +64,7 @@ def _read_location_from_secrets() -> Optional[str]:
     - 空文字は無視して None を返す。
     """
     try:
-        import streamlit as st  # 遅延インポート（未導入環境に配慮）
+        st = _streamlit()
         env_sec = {}
         try:
             # 標準の配置: [env].location
@@ -75,12 +94,17 @@ def load_settings() -> dict:
     """
     settings.toml を候補パスから読み込む。
     見つからない場合は詳細な案内付きで FileNotFoundError。
+    load_toml のキャッシュを共有しないよう、呼び出し側にはコピーを返す（書き換えても他に影響しない）。
     """
-    for p in _candidate_paths():
-        if p.exists():
-            return _load_toml(p)
+    candidates = _candidate_paths()
+    for p in candidates:
+        try:
+            mtime_ns = p.stat().st_mtime_ns
+        except OSError:
+            continue
+        return copy.deepcopy(load_toml(p, mtime_ns))
 
-    tried = [str(p) for p in _candidate_paths()]
+    tried = [str(p) for p in candidates]
     raise FileNotFoundError(
         "設定ファイル settings.toml が見つかりませんでした。\n"
         "探した場所:\n- " + "\n- ".join(tried) + "\n\n"
@@ -144,5 +168,20 @@ def get_project_root() -> Path:
     return root.resolve()
 
 
-# 即時解決して他モジュールから import 利用
-PROJECT_ROOT = get_project_root()
+# ------------------------------------------------------------
+# PROJECT_ROOT（初回アクセス時に解決してモジュール内に保持）
+# ------------------------------------------------------------
+_PROJECT_ROOT: Optional[Path] = None
+
+
+def __getattr__(name: str):
+    """
+    `from config.path_config import PROJECT_ROOT` を遅延解決する（PEP 562）。
+    一度解決した Path はプロセス内で使い回す（Streamlit の rerun でも再計算しない）。
+    """
+    global _PROJECT_ROOT
+    if name == "PROJECT_ROOT":
+        if _PROJECT_ROOT is None:
+            _PROJECT_ROOT = get_project_root()
+        return _PROJECT_ROOT
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,27 +3,26 @@
 # アプリの起動・停止ユーティリティ
 # - lsof/kill を用いた複数 PID 安全停止
 # - <app>_project/<app>_app 規約に基づく app_spec_list
-# - Streamlit を baseUrlPath/port 指定で nohup 起動
+# - Streamlit を baseUrlPath/port 指定でバックグラウンド起動（新セッションで切り離し）
+# - probe_specs で複数アプリの存在確認/port 検出を並列に事前取得
 # ============================================================
 
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import subprocess
-import textwrap
 import time
 import os
-import re
 import signal
 
+from lib.proc import runproc
+
 # ---------- サブプロセス ----------
 def run(cmd: str | list[str], shell: bool = False) -> tuple[int, str]:
     """サブプロセス実行（stdout+stderr を結合して返す）"""
-    try:
-        proc = subprocess.run(cmd, capture_output=True, text=True, shell=shell)
-        return proc.returncode, (proc.stdout or "") + (proc.stderr or "")
-    except Exception as e:
-        return 1, f"[Exception] {e}"
+    return runproc(cmd, shell=shell)
 
 # ---------- 共通ユーティリティ ----------
 def ensure_dir(p: Path) -> None:
@@ -37,14 +36,21 @@ def is_pid_running(pid: int) -> bool:
     except Exception:
         return False
 
+def _reap_if_child(pid: int) -> None:
+    """自プロセスの子なら waitpid で回収（ゾンビのままだと kill(pid, 0) が成功し続けるため）"""
+    try:
+        os.waitpid(pid, os.WNOHANG)
+    except Exception:
+        pass
+
 def parse_pids(pid_txt: str) -> List[int]:
     """'1393\\n2604\\n2629' のような文字列から PID(int) の配列を返す。空白・非数は除去。"""
     if not pid_txt:
         return []
-    return [int(t) for t in re.findall(r"\d+", pid_txt)]
+    return [int(t) for t in pid_txt.split() if t.isdigit()]
 
 def kill_pids(pids: List[int], grace_sec: float = 3.0) -> Tuple[bool, str]:
-    """複数 PID を安全停止（SIGTERM→待機→必要なら SIGKILL）"""
+    """複数 PID を安全停止（SIGTERM→終了を待機（最大 grace_sec）→必要なら SIGKILL）"""
     if not pids:
         return False, "PIDが見つかりませんでした。"
 
@@ -57,16 +63,21 @@ def kill_pids(pids: List[int], grace_sec: float = 3.0) -> Tuple[bool, str]:
         except Exception as e:
             return False, f"SIGTERM送信中に例外: pid={pid} err={e}"
 
-    time.sleep(grace_sec)
+    # 終了待ち：最大 grace_sec まで、10ms から倍々（上限 0.2s）で生存確認
+    deadline = time.monotonic() + grace_sec
+    delay = 0.01
+    alive = set(pids)
+    while alive and time.monotonic() < deadline:
+        for p in alive:
+            _reap_if_child(p)
+        alive = {p for p in alive if is_pid_running(p)}
+        if not alive:
+            break
+        time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+        delay = min(delay * 2, 0.2)
 
     # 生存チェック → SIGKILL
-    still = []
-    for pid in pids:
-        try:
-            os.kill(pid, 0)
-            still.append(pid)
-        except ProcessLookupError:
-            pass
+    still = [pid for pid in pids if pid in alive and is_pid_running(pid)]
 
     for pid in still:
         try:
@@ -80,46 +91,149 @@ def kill_pids(pids: List[int], grace_sec: float = 3.0) -> Tuple[bool, str]:
 
 def find_pids_by_port(port: int) -> list[int]:
     """lsof -ti tcp:<port> の結果（複数行可）を配列で返す。見つからない場合は空配列。"""
-    code, out = run(f"lsof -ti tcp:{int(port)} || true", shell=True)
-    return parse_pids(out)
+    # shell を介さず直接実行。該当なしのとき lsof は returncode=1 を返すが、空扱いでよい
+    try:
+        proc = subprocess.run(["lsof", "-ti", f"tcp:{int(port)}"], capture_output=True, text=True)
+    except Exception:
+        return []
+    return parse_pids(proc.stdout)
+
+def listening_port_map() -> dict[int, list[int]]:
+    """
+    LISTEN 中の TCP ソケットを lsof 1 回で取得し、port → [pid, ...] の辞書で返す。
+    `-F pn` の機械可読出力を行単位で解析する:
+      p<PID>          … 以降の n 行はこの PID のもの
+      n<ADDR>:<PORT>  … 例: n*:8501 / n127.0.0.1:8501 / n[::1]:8501
+    """
+    try:
+        proc = subprocess.run(
+            ["lsof", "-iTCP", "-sTCP:LISTEN", "-nP", "-F", "pn"],
+            capture_output=True, text=True,
+        )
+    except Exception:
+        return {}
+
+    port_map: dict[int, list[int]] = {}
+    pid: int | None = None
+    for line in proc.stdout.splitlines():
+        if not line:
+            continue
+        tag, val = line[0], line[1:]
+        if tag == "p":
+            pid = int(val) if val.isdigit() else None
+        elif tag == "n" and pid is not None:
+            port_txt = val.rpartition(":")[2]
+            if port_txt.isdigit():
+                pids = port_map.setdefault(int(port_txt), [])
+                if pid not in pids:
+                    pids.append(pid)
+    return port_map
 
 # ---------- スペック生成 ----------
+def _build_spec(project_root: Path, name: str, port: int) -> dict:
+    """1 アプリ分の spec（パス一式）を組み立てる"""
+    app_dir = project_root / f"{name}_project" / f"{name}_app"
+    pid_dir = app_dir / ".run"
+    log_dir = app_dir / "logs"
+    return dict(
+        name=name, port=port,
+        app_dir=app_dir,
+        venv_activate=app_dir / ".venv" / "bin" / "activate",
+        app_py=app_dir / "app.py",
+        pid_dir=pid_dir, pid_file=pid_dir / f"{name}.pid",
+        log_dir=log_dir, log_file=log_dir / f"{name}.log",
+    )
+
 def app_spec_list(settings: dict, app_map: dict) -> list[dict]:
     """
     nginx.toml の enabled=true のアプリを配列で返す。
     規約: <project_root>/<app>_project/<app>_app/ に app.py と .venv/ が存在。
     """
-    loc = settings["env"]["location"]
-    project_root = Path(settings["locations"][loc]["project_root"])
-    specs = []
+    # 先に enabled かつ port 指定ありのものだけに絞る（無ければパス計算もしない）
+    enabled: list[tuple[str, int]] = []
     for name, cfg in app_map.items():
-        if not isinstance(cfg, dict):
-            continue
-        if not cfg.get("enabled", True):
+        if not isinstance(cfg, dict) or not cfg.get("enabled", True):
             continue
         port = int(cfg.get("port", 0))
-        if not port:
-            continue
+        if port:
+            enabled.append((name, port))
+    if not enabled:
+        return []
+
+    loc = settings["env"]["location"]
+    project_root = Path(settings["locations"][loc]["project_root"])
+    return [_build_spec(project_root, name, port) for name, port in enabled]
+
+# ---------- 事前プローブ（並列） ----------
+@dataclass
+class ProbeResult:
+    """start_one_app / stop_one_app 用に事前取得したファイル有無・PID 情報"""
+    app_dir_exists: bool
+    venv_exists: bool
+    app_py_exists: bool
+    port_pids: List[int] = field(default_factory=list)
+    pid: Optional[int] = None       # pid ファイルの PID（なし/壊れていれば None）
+
+
+def _read_pid_fast(pid_file: Path) -> Optional[int]:
+    """pid ファイルの先頭 16 バイトだけ読んで PID を返す（なし/壊れていれば None）"""
+    try:
+        with pid_file.open("rb") as f:
+            return int(f.read(16).strip() or b"0") or None
+    except Exception:
+        return None
+
+
+def _probe_one(spec: dict, port_map: Optional[dict[int, list[int]]] = None) -> ProbeResult:
+    if port_map is None:
+        port_pids = find_pids_by_port(spec["port"])
+    else:
+        port_pids = list(port_map.get(spec["port"], []))
+
+    # app_dir を 1 回 scandir して直下の名前集合で判定（exists() の stat を個別に打たない）
+    try:
+        with os.scandir(spec["app_dir"]) as it:
+            entries = {e.name for e in it}
+        app_dir_exists = True
+    except OSError:
+        entries = set()
+        app_dir_exists = False
+
+    venv_exists = False
+    if ".venv" in entries:
+        try:
+            os.stat(spec["venv_activate"])
+            venv_exists = True
+        except OSError:
+            pass
+
+    return ProbeResult(
+        app_dir_exists=app_dir_exists,
+        venv_exists=venv_exists,
+        app_py_exists=spec["app_py"].name in entries,
+        port_pids=port_pids,
+        pid=_read_pid_fast(spec["pid_file"]),
+    )
+
+
+def probe_specs(specs: list[dict], max_workers: int = 8) -> dict[str, ProbeResult]:
+    """
+    全 spec の stat をスレッドプールで並列に実行し、name → ProbeResult を返す。
+    port → PID は listening_port_map() で lsof を 1 回だけ実行して引く。
+    """
+    if not specs:
+        return {}
+    port_map = listening_port_map()
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        results = list(ex.map(lambda sp: _probe_one(sp, port_map), specs))
+    return {sp["name"]: r for sp, r in zip(specs, results)}
 
-        app_dir = project_root / f"{name}_project" / f"{name}_app"
-        venv_activate = app_dir / ".venv" / "bin" / "activate"
-        app_py = app_dir / "app.py"
-        pid_dir = app_dir / ".run"
-        pid_file = pid_dir / f"{name}.pid"
-        log_dir = app_dir / "logs"
-        log_file = log_dir / f"{name}.log"
-
-        specs.append(dict(
-            name=name, port=port,
-            app_dir=app_dir, venv_activate=venv_activate, app_py=app_py,
-            pid_dir=pid_dir, pid_file=pid_file, log_dir=log_dir, log_file=log_file
-        ))
-    return specs
 
 # ---------- 起動/停止 ----------
-def start_one_app(spec: dict) -> tuple[bool, str]:
+def start_one_app(spec: dict, probe: Optional[ProbeResult] = None) -> tuple[bool, str]:
     """
-    仮想環境を有効化し、Streamlit を baseUrlPath/port 指定で起動（nohup バックグラウンド）
+    仮想環境の python で Streamlit を baseUrlPath/port 指定で起動（新セッションで切り離し）
+    probe を渡すと、存在確認・PID 確認はその結果を使う（probe_specs で一括取得したもの）。
     成功時: (True, メッセージ)
     """
     app_dir: Path = spec["app_dir"]
@@ -132,81 +246,95 @@ def start_one_app(spec: dict) -> tuple[bool, str]:
     name: str = spec["name"]
     port: int = spec["port"]
 
-    if not app_dir.exists():
+    if probe is None:
+        probe = _probe_one(spec)
+
+    if not probe.app_dir_exists:
         return False, f"[{name}] app_dir が見つかりません: {app_dir}"
-    if not venv_activate.exists():
+    if not probe.venv_exists:
         return False, f"[{name}] 仮想環境が見つかりません: {venv_activate}"
-    if not app_py.exists():
+    if not probe.app_py_exists:
         return False, f"[{name}] エントリファイルが見つかりません: {app_py}"
 
     ensure_dir(pid_dir)
     ensure_dir(log_dir)
 
     # 既存の PID で動いていればスキップ
-    if pid_file.exists():
-        try:
-            old_pid = int(pid_file.read_text().strip())
-            if is_pid_running(old_pid):
-                return True, f"[{name}] 既に起動中 (pid={old_pid})"
-        except Exception:
-            pass
+    old_pid = probe.pid
+    if old_pid and is_pid_running(old_pid):
+        return True, f"[{name}] 既に起動中 (pid={old_pid})"
 
     # 既にポートで動いているプロセスがあれば、それもスキップ扱い
-    existing_pids = find_pids_by_port(port)
+    existing_pids = probe.port_pids
     if existing_pids:
         return True, f"[{name}] port {port} ですでにプロセス稼働中 (pid={existing_pids})"
 
-    # nohup 起動（baseUrlPath は name を利用）
-    cmd = textwrap.dedent(f"""
-        set -e
-        cd "{app_dir}"
-        . "{venv_activate}"
-        nohup python -m streamlit run "{app_py.name}" \
-          --server.baseUrlPath="{name}" \
-          --server.port={port} \
-          --server.headless=true \
-          > "{log_file}" 2>&1 < /dev/null &
-        echo $! > "{pid_file}"
-    """).strip()
-
-    code, out = run(["bash", "-lc", cmd])
-    if code == 0:
-        time.sleep(1.2)  # 少し待って PID 確認
-        pid_txt = pid_file.read_text().strip() if pid_file.exists() else "?"
-        return True, f"[{name}] 起動開始 OK (pid={pid_txt})\n  log: {log_file}"
-    else:
-        return False, f"[{name}] 起動失敗\n{out}"
+    # .venv/bin/python を直接起動（activate がやっているのは VIRTUAL_ENV と PATH の設定だけ）
+    venv_dir = venv_activate.parent.parent
+    venv_python = venv_dir / "bin" / "python"
+    env = dict(os.environ)
+    env.pop("PYTHONHOME", None)
+    env["VIRTUAL_ENV"] = str(venv_dir)
+    env["PATH"] = f"{venv_dir / 'bin'}{os.pathsep}{env.get('PATH', '')}"
+
+    argv = [
+        str(venv_python), "-m", "streamlit", "run", app_py.name,
+        f"--server.baseUrlPath={name}",   # baseUrlPath は name を利用
+        f"--server.port={port}",
+        "--server.headless=true",
+    ]
+    try:
+        with open(log_file, "wb", buffering=0) as log_fp:
+            proc = subprocess.Popen(
+                argv,
+                cwd=app_dir,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=log_fp,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,   # nohup 相当：端末/親のシグナルから切り離す
+            )
+    except Exception as e:
+        return False, f"[{name}] 起動失敗\n{e}"
+
+    # PID を原子的に書き込み
+    tmp = pid_file.with_suffix(pid_file.suffix + ".tmp")
+    tmp.write_text(f"{proc.pid}\n")
+    tmp.replace(pid_file)
+    return True, f"[{name}] 起動開始 OK (pid={proc.pid})\n  log: {log_file}"
 
-def stop_one_app(spec: dict) -> tuple[bool, str]:
-    """PID ファイル優先で停止。なければ port からも停止を試みる（複数PID対応）"""
+def stop_one_app(spec: dict, probe: Optional[ProbeResult] = None) -> tuple[bool, str]:
+    """
+    PID ファイル優先で停止。なければ port からも停止を試みる（複数PID対応）
+    probe を渡すと、pid ファイルの PID と port の PID はその結果を使う
+    （probe_specs 経由なら、停止対象がなければサブプロセスは起動しない）。
+    """
     name: str = spec["name"]
     pid_file: Path = spec["pid_file"]
     port: int = spec["port"]
 
-    # 1) PIDファイル優先
-    if pid_file.exists():
-        try:
-            pid = int(pid_file.read_text().strip())
-        except Exception:
-            pid = None
-        if pid and is_pid_running(pid):
-            ok, msg = kill_pids([pid])
-            if ok:
-                try:
-                    pid_file.unlink(missing_ok=True)
-                except Exception:
-                    pass
-                return True, f"[{name}] 停止 OK (pid={pid})"
-            else:
-                return False, f"[{name}] 停止失敗 (pid={pid})\n{msg}"
-        else:
+    pid = probe.pid if probe is not None else _read_pid_fast(pid_file)
+
+    # 1) PIDファイル優先（os.kill(pid, 0) 1 回で生存確認）
+    if pid and is_pid_running(pid):
+        ok, msg = kill_pids([pid])
+        if ok:
             try:
                 pid_file.unlink(missing_ok=True)
             except Exception:
                 pass
+            return True, f"[{name}] 停止 OK (pid={pid})"
+        else:
+            return False, f"[{name}] 停止失敗 (pid={pid})\n{msg}"
+
+    # 古い/壊れた pid ファイルは削除（なければ何もしない）
+    try:
+        pid_file.unlink(missing_ok=True)
+    except Exception:
+        pass
 
     # 2) ポートから検出（複数PID対応）
-    pids = find_pids_by_port(port)
+    pids = probe.port_pids if probe is not None else find_pids_by_port(port)
     if pids:
         ok, msg = kill_pids(pids)
         if ok:
@@ -1,24 +1,93 @@
 # lib/cmd_utils.py
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import os
 import shlex
+import shutil
 import subprocess
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple, Optional
+
+from lib.gitfs import read_config_remotes, read_config_ssh_command
 
 __all__ = [
     "run_safe",
     "git",
+    "git_stream",
     "is_git_repo",
     "git_branch",
     "git_remote_first",
-    "git_status_short",
-    "git_changed_count",
+    "git_meta_bulk",
+    "git_many",
 ]
 
 # 許可コマンド（先頭トークン）
-ALLOWLIST = {
+ALLOWLIST: frozenset[str] = frozenset({
     "ls", "pwd", "whoami", "df", "du", "diskutil",
     "git", "python", "python3",
-}
+})
+
+# 作業ツリーを変更しない git サブコマンド（--no-optional-locks を付ける対象）
+_READONLY_SUBCOMMANDS: frozenset[str] = frozenset({
+    "status", "rev-parse", "remote", "log", "diff", "show", "for-each-ref",
+    "ls-files", "rev-list", "describe", "cat-file",
+})
+
+# shlex.split が必要になる文字（引用符・エスケープ）
+_QUOTE_CHARS = frozenset("'\"\\")
+
+@lru_cache(maxsize=16)
+def _exe_path(name: str) -> Optional[str]:
+    """コマンドの絶対パス（PATH 検索は名前ごとに 1 回だけ）"""
+    return shutil.which(name)
+
+# posix_spawn（close_fds=False）で起動してよい git サブコマンド：短時間で終わる読み取り専用の問い合わせ。
+# push / pull / fetch / clone などは ssh の ControlMaster（ControlPersist で長く残る）を起動し得るので、
+# 親（Streamlit サーバ）の fd を引き継がせないよう close_fds=True のままにする。
+# remote は `remote update` で fetch するので除く
+_FAST_SPAWN_SUBCOMMANDS: frozenset[str] = _READONLY_SUBCOMMANDS - {"remote"}
+
+def _git_subcommand(argv: Sequence[str]) -> str:
+    """git の argv からサブコマンド名を取り出す（-C <path> / -c <k=v> などのグローバルオプションを飛ばす）"""
+    i = 1
+    while i < len(argv) and argv[i].startswith("-"):
+        i += 2 if argv[i] in ("-C", "-c") else 1
+    return argv[i] if i < len(argv) else ""
+
+def _spawn_kwargs(argv: Sequence[str]) -> dict:
+    """
+    subprocess が fork ではなく posix_spawn（vfork 相当、親のメモリを複製しない）を選べる引数。
+    条件は executable が絶対パス・close_fds=False・cwd=None（作業ディレクトリは git -C で渡す）。
+    close_fds=False は _FAST_SPAWN_SUBCOMMANDS の git だけに限る（それ以外は絶対パスだけ渡す）。
+    """
+    exe = _exe_path(argv[0])
+    if not exe:
+        return {}
+    if argv[0] == "git" and _git_subcommand(argv) in _FAST_SPAWN_SUBCOMMANDS:
+        return {"executable": exe, "close_fds": False}
+    return {"executable": exe}
+
+def _run_argv(
+    argv: List[str],
+    *,
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+    stdin: Optional[bytes] = None,
+) -> Tuple[int, str, str]:
+    """内部呼び出し用：組み立て済み argv を shell=False で実行（ALLOWLIST チェックなし）。stdin は子の標準入力へ渡す bytes。"""
+    try:
+        # bytes で受けて直接デコード（text=True のラッパ層を通さない）
+        p = subprocess.run(
+            argv, input=stdin, capture_output=True, check=False, cwd=cwd, env=env,
+            **_spawn_kwargs(argv),
+        )
+        return (
+            p.returncode,
+            p.stdout.decode("utf-8", "replace").strip(),
+            p.stderr.decode("utf-8", "replace").strip(),
+        )
+    except Exception as e:
+        return 1, "", f"💥 実行エラー: {e}"
 
 def run_safe(cmdline: str, *, cwd: Optional[str] = None) -> Tuple[int, str, str]:
     """ALLOWLIST を満たす単一コマンドを shell=False で安全実行。"""
@@ -28,33 +97,212 @@ def run_safe(cmdline: str, *, cwd: Optional[str] = None) -> Tuple[int, str, str]
     head = tokens[0]
     if head not in ALLOWLIST:
         return (1, "", f"🚫 許可されていないコマンド: `{head}`")
+    return _run_argv(tokens, cwd=cwd)
+
+def _git_argv(
+    args: str | Sequence[str],
+    readonly: Optional[bool] = None,
+    cwd: Optional[str | os.PathLike] = None,
+) -> List[str]:
+    """
+    git 用 argv を組み立てる。
+    リストで渡した引数はそのまま argv にする（クォート不要・字句解析なし）。
+    文字列の場合、引用符を含まなければ str.split、含めば shlex.split で分割する。
+    readonly: None はサブコマンドから自動判定、True / False で --no-optional-locks の有無を明示。
+    cwd は Popen の cwd ではなく `git -C <cwd>` で渡す（posix_spawn の経路を使えるように）。
+    """
+    if not isinstance(args, str):
+        argv = ["git", *args]
+    elif _QUOTE_CHARS.isdisjoint(args):
+        argv = ["git", *args.split()]
+    else:
+        argv = ["git", *shlex.split(args)]
+    # 読み取り専用の問い合わせは index.lock を取らせない（stat キャッシュの書き戻しも省く）
+    if readonly is None:
+        readonly = len(argv) > 1 and argv[1] in _READONLY_SUBCOMMANDS
+    if readonly:
+        argv.insert(1, "--no-optional-locks")
+    if cwd is not None:
+        argv[1:1] = ["-C", str(cwd)]
+    return argv
+
+def git(
+    args: str | Sequence[str],
+    *,
+    cwd: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+    readonly: Optional[bool] = None,
+    stdin: Optional[bytes] = None,
+) -> Tuple[int, str, str]:
+    """
+    git サブコマンド用のヘルパ（例: git('status -sb', cwd=...) / git(["commit", "-m", msg], cwd=...)）。
+    readonly=True で --no-optional-locks を付ける（既定は _READONLY_SUBCOMMANDS から自動判定）。
+    stdin は標準入力に渡す bytes（例: git(["commit", "-F", "-"], stdin=msg.encode())）。
+    """
+    return _run_argv(_git_argv(args, readonly, cwd), env=env, stdin=stdin)
+
+def git_stream(
+    args: str | Sequence[str],
+    on_line: Callable[[str], None],
+    *,
+    cwd: Optional[str] = None,
+) -> int:
+    """
+    git を実行し、stdout+stderr を 1 行ずつ on_line に渡す（全出力を溜めてから返さない）。
+    clone / pull のような長い処理の途中経過を画面に出す用。戻り値は終了コード。
+    """
+    argv = _git_argv(args, cwd=cwd)
     try:
-        p = subprocess.run(tokens, capture_output=True, text=True, check=False, cwd=cwd)
-        return p.returncode, p.stdout.strip(), p.stderr.strip()
+        proc = subprocess.Popen(
+            argv, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, **_spawn_kwargs(argv),
+        )
     except Exception as e:
-        return 1, "", f"💥 実行エラー: {e}"
-
-def git(args: str, *, cwd: Optional[str] = None) -> Tuple[int, str, str]:
-    """git サブコマンド用のヘルパ（例: git('status -sb', cwd=...))."""
-    return run_safe(f"git {args}", cwd=cwd)
+        on_line(f"💥 実行エラー: {e}\n")
+        return 1
+    with proc:
+        for raw in proc.stdout:
+            on_line(raw.decode("utf-8", "replace"))
+    return proc.returncode
 
 # ---- Git 情報系ユーティリティ ----
 def is_git_repo(path: str) -> bool:
-    code, out, _ = git("rev-parse --is-inside-work-tree", cwd=path)
-    return code == 0 and out == "true"
+    """
+    path が Git の作業ツリー内か（`rev-parse --is-inside-work-tree` 相当）をサブプロセスなしで判定。
+    path から親へ辿り、.git（ディレクトリ、または worktree / submodule の gitfile）を探す。
+    .git ディレクトリの内部は作業ツリー外として False。
+    """
+    cur = os.path.abspath(path)
+    if not os.path.isdir(cur):
+        return False
+    while True:
+        if os.path.basename(cur) == ".git":
+            return False
+        g = os.path.join(cur, ".git")
+        if os.path.isdir(g) or os.path.isfile(g):
+            return True
+        parent = os.path.dirname(cur)
+        if parent == cur:
+            return False
+        cur = parent
 
 def git_branch(path: str) -> str:
     code, out, _ = git("rev-parse --abbrev-ref HEAD", cwd=path)
     return out if code == 0 else ""
 
+def _remote_first_from_config(path: str) -> Optional[str]:
+    """
+    .git/config から `remote -v` の先頭行と同じ "name\turl (fetch)" を作る（リモートなしは ""）。
+    config から判断できない構成は None（git に任せる）。
+    """
+    remotes = read_config_remotes(path)
+    if remotes is None:
+        return None
+    if not remotes:
+        return ""
+    # `remote -v` はリモート名の昇順で並ぶので、先頭行も名前順で最初のもの
+    name = min(remotes)
+    return f"{name}\t{remotes[name]} (fetch)"
+
 def git_remote_first(path: str) -> str:
+    """`git remote -v` の先頭行。まず .git/config を読み、読めない構成のときだけ git を起動する。"""
+    fast = _remote_first_from_config(path)
+    if fast is not None:
+        return fast
     code, out, _ = git("remote -v", cwd=path)
     return out.splitlines()[0] if code == 0 and out else ""
 
-def git_status_short(path: str) -> str:
-    code, out, err = git("status -sb", cwd=path)
-    return out or err
+def git_meta_bulk(path: str) -> dict:
+    """
+    `status --porcelain=v2 --branch` 1 回でブランチ・上流・ahead/behind・変更数をまとめて返す。
+    戻り値: is_repo / branch / upstream / ahead / behind / changed
+    （is_repo は終了コードで判定。detached HEAD の branch は "HEAD"）
+    """
+    meta = {"is_repo": False, "branch": "", "upstream": "", "ahead": 0, "behind": 0, "changed": 0}
+    code, out, _ = git(["status", "--porcelain=v2", "--branch"], cwd=path)
+    if code != 0:
+        return meta
+    meta["is_repo"] = True
+    for line in out.splitlines():
+        if not line.startswith("# "):
+            meta["changed"] += 1
+        elif line.startswith("# branch.head "):
+            head = line[len("# branch.head "):]
+            meta["branch"] = "HEAD" if head == "(detached)" else head
+        elif line.startswith("# branch.upstream "):
+            meta["upstream"] = line[len("# branch.upstream "):]
+        elif line.startswith("# branch.ab "):
+            a, _, b = line[len("# branch.ab "):].partition(" ")
+            meta["ahead"], meta["behind"] = int(a), -int(b)
+    return meta
+
+def _ssh_multiplex_env() -> Optional[Dict[str, str]]:
+    """
+    一括 fetch / pull / push 用：同じホストへの ssh 接続を ControlMaster で 1 本に束ねる環境変数。
+    制御ソケットは ~/.ssh（0700）に置く（/tmp だと他ユーザーから見える）。
+    GIT_SSH_COMMAND / GIT_SSH が既に設定されている場合はそれを尊重して None。
+    core.sshCommand はリポジトリごとに _has_ssh_command で確かめる（git_many）。
+    """
+    if "GIT_SSH_COMMAND" in os.environ or "GIT_SSH" in os.environ:
+        return None
+    ssh_dir = os.path.expanduser("~/.ssh")
+    if not os.path.isdir(ssh_dir):
+        return None
+    return {
+        **os.environ,
+        "GIT_SSH_COMMAND": (
+            "ssh -o ControlMaster=auto -o ControlPersist=60s"
+            f" -o ControlPath={shlex.quote(os.path.join(ssh_dir, 'cm-%C'))}"
+        ),
+    }
+
+def _user_git_configs() -> Tuple[str, ...]:
+    """global / system の git config ファイル（core.sshCommand の確認用）"""
+    xdg = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return (
+        os.path.expanduser("~/.gitconfig"),
+        os.path.join(xdg, "git", "config"),
+        "/etc/gitconfig",
+    )
+
+def _has_ssh_command(cwd: str) -> bool:
+    """
+    cwd のリポジトリで core.sshCommand が設定されているか（GIT_SSH_COMMAND で上書きしてはいけないか）。
+    .git/config と global / system の config を gitfs で読み（mtime キャッシュ、git を起動しない）、
+    worktree や [include] などで判断できないときだけ `git config --get` に任せる。
+    """
+    repo_cfg = os.path.join(cwd, ".git", "config")
+    if os.path.isfile(repo_cfg):
+        for cfg in (repo_cfg, *_user_git_configs()):
+            value = read_config_ssh_command(cfg)
+            if value is None:
+                break
+            if value:
+                return True
+        else:
+            return False
+    code, out, _ = _run_argv(["git", "-C", cwd, "config", "--get", "core.sshCommand"])
+    return bool(out)
+
+def git_many(
+    args: str | Sequence[str],
+    paths: Iterable[str],
+    *,
+    max_workers: int = 8,
+) -> List[Tuple[int, str, str]]:
+    """
+    複数リポジトリで同じ git サブコマンドをスレッドプールで並列実行する。
+    fetch / pull / push のようなネットワーク待ちを重ねられる。結果は paths と同じ順で返す。
+    ssh リモートは ControlMaster で接続を共有する（_ssh_multiplex_env）。
+    core.sshCommand（デプロイキー等）を持つリポジトリは上書きせず、その設定のまま実行する。
+    """
+    path_list = [str(p) for p in paths]
+    if not path_list:
+        return []
+    env = _ssh_multiplex_env()
+
+    def _one(p: str) -> Tuple[int, str, str]:
+        use_env = env if env is not None and not _has_ssh_command(p) else None
+        return git(args, cwd=p, env=use_env)
 
-def git_changed_count(path: str) -> int:
-    code, out, _ = git("status --porcelain=v1", cwd=path)
-    return len(out.splitlines()) if code == 0 and out else 0
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(path_list))) as ex:
+        return list(ex.map(_one, path_list))
@@ -0,0 +1,99 @@
+"""
+lib/gitfs.py
+==========================================
+.git 配下のファイルを git を起動せずに直接読むヘルパ
+
+提供機能
+--------
+- read_config_remotes(path) -> dict[str, str] | None
+    .git/config の [remote "<name>"] の url を {name: url}（ファイル順）で返す。
+    [include] / [url] など git 本体でないと解決できない記述があれば None。
+- read_config_ssh_command(cfg) -> str | None
+    config ファイル（.git/config や ~/.gitconfig）の core.sshCommand。未設定は ""。
+
+いずれもファイルの mtime_ns をキーにキャッシュし、ファイルが変わらない間は再読み込みしない
+（rerun のたびに呼ばれても stat 1 回で済む）。None は「git に任せる」の意味。
+
+使用例
+------
+from lib.gitfs import read_config_remotes
+
+remotes = read_config_remotes(repo)  # {"origin": "git@github.com:..."} / None
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+
+def _mtime_ns(path: str) -> int:
+    """ファイルの mtime_ns（無ければ -1）。キャッシュキー用"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+# ---- config ----
+_REMOTE_SECTION_RE = re.compile(r'^\[\s*remote\s+"(.*)"\s*\]')
+
+
+def read_config_remotes(path: str) -> Optional[Dict[str, str]]:
+    """
+    <path>/.git/config の各 remote の url を {name: url}（ファイル順）で返す（リモートなしは {}）。
+    gitfile（worktree 等）・サブディレクトリ指定・[include] / [url] 書き換えがある場合は None。
+    戻り値はキャッシュを共有しているので書き換えないこと。
+    """
+    cfg = os.path.join(path, ".git", "config")
+    parsed = _read_config_cached(cfg, _mtime_ns(cfg))
+    return None if parsed is None else parsed[0]
+
+
+def read_config_ssh_command(cfg: str) -> Optional[str]:
+    """
+    config ファイル cfg の core.sshCommand（未設定は ""）。ファイルが無ければ ""。
+    [include] / [url] があって git 本体でないと判断できない場合は None。
+    """
+    mtime = _mtime_ns(cfg)
+    if mtime < 0:
+        return ""
+    parsed = _read_config_cached(cfg, mtime)
+    return None if parsed is None else parsed[1]
+
+
+@lru_cache(maxsize=256)
+def _read_config_cached(cfg: str, _mtime: int) -> Optional[Tuple[Dict[str, str], str]]:
+    """config を 1 回読み、({remote: url}, core.sshCommand) を返す。読めない・解決できない記述があれば None"""
+    try:
+        with open(cfg, encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    remotes: Dict[str, str] = {}
+    ssh_command = ""
+    section = ""
+    in_core = False
+    for raw in lines:
+        line = raw.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            lower = line.lower()
+            if lower.startswith(("[include", "[url")):
+                return None
+            m = _REMOTE_SECTION_RE.match(line)
+            section = m.group(1) if m else ""
+            in_core = lower.replace(" ", "") == "[core]"
+            continue
+        if "=" not in line:
+            continue
+        key, _, val = line.partition("=")
+        key = key.strip().lower()
+        if in_core and key == "sshcommand":
+            # 後に書かれた値が優先（git config --get と同じ）
+            ssh_command = val.strip().strip('"')
+        elif section and section not in remotes and key == "url":
+            remotes[section] = val.strip().strip('"')
+    return remotes, ssh_command
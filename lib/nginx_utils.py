@@ -2,56 +2,69 @@
 from __future__ import annotations
 from pathlib import Path
 from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from types import ModuleType
 import os
-import shutil
 import subprocess
-import textwrap
+import sys
 import time
-import toml
 from typing import Tuple, Optional
 
+from lib.proc import runproc
+from lib.toml_cache import load_toml
+
 # ========= 定数 =========
 SETTINGS_FILE = Path(".streamlit/settings.toml")
 DEFAULT_CONF_NAME = "nginx.conf"
 
 # 空の場合に編集エリアへ出す最小テンプレート（UI用）
-MINIMAL_NGINX_CONF = textwrap.dedent("""
-    # --------------------------------------------
-    # Minimal nginx.conf (sample)
-    # --------------------------------------------
-    worker_processes  1;
-
-    events {
-        worker_connections  1024;
+MINIMAL_NGINX_CONF = """\
+# --------------------------------------------
+# Minimal nginx.conf (sample)
+# --------------------------------------------
+worker_processes  1;
+
+events {
+    worker_connections  1024;
+}
+
+http {
+    include       mime.types;
+    default_type  application/octet-stream;
+
+    sendfile        on;
+    keepalive_timeout  65;
+
+    server {
+        listen       80;
+        server_name  _;
+
+        # ドキュメントルート（必要に応じて変更）
+        root   /usr/local/var/www;
+        index  index.html;
     }
+}
+"""
 
-    http {
-        include       mime.types;
-        default_type  application/octet-stream;
 
-        sendfile        on;
-        keepalive_timeout  65;
+# ========= 共通ユーティリティ =========
+def run_cmd(cmd: list[str] | str, shell: bool = False) -> Tuple[int, str]:
+    """コマンド実行（stdout+stderr を連結して返す）"""
+    return runproc(cmd, shell=shell)
 
-        server {
-            listen       80;
-            server_name  _;
 
-            # ドキュメントルート（必要に応じて変更）
-            root   /usr/local/var/www;
-            index  index.html;
-        }
-    }
-""").strip() + "\n"
+# ---- streamlit の遅延インポート（CLI からの利用では読み込まない）----
+_st_mod: Optional[ModuleType] = None
 
 
-# ========= 共通ユーティリティ =========
-def run_cmd(cmd: list[str] | str, shell: bool = False) -> Tuple[int, str]:
-    """コマンド実行（stdout+stderr を連結して返す）"""
-    try:
-        p = subprocess.run(cmd, capture_output=True, text=True, shell=shell)
-        return p.returncode, (p.stdout or "") + (p.stderr or "")
-    except Exception as e:
-        return 1, f"[Exception] {e}"
+def _streamlit() -> ModuleType:
+    """streamlit を初回だけ import し、以降はモジュール参照を使い回す。"""
+    global _st_mod
+    if _st_mod is None:
+        import streamlit as st
+        _st_mod = st
+    return _st_mod
 
 
 # ---- secrets から location を読む（最優先）----
@@ -62,7 +75,7 @@ def _read_location_from_secrets() -> Optional[str]:
     - 旧仕様 (トップレベル location) も互換として一応サポート。
     """
     try:
-        import streamlit as st  # 遅延インポート
+        st = _streamlit()  # 遅延インポート
 
         # --- 新仕様: [env].location ---
         try:
@@ -97,7 +110,8 @@ def load_settings(settings_path: Path = SETTINGS_FILE) -> dict:
     data: dict = {}
     if settings_path.exists():
         try:
-            data = toml.load(settings_path)
+            # キャッシュ共有の dict を書き換えないよう、トップレベルだけコピー
+            data = dict(load_toml(settings_path))
         except Exception as e:
             raise RuntimeError(f"{settings_path} の読込に失敗: {e}") from e
     else:
@@ -143,33 +157,86 @@ def resolve_nginx_conf_path(settings: dict) -> Path:
     if not nginx_root_raw:
         raise KeyError(f"[locations].{loc}.nginx_root が未設定です。")
 
-    nginx_root = Path(str(nginx_root_raw)).expanduser().resolve()
-    return nginx_root / DEFAULT_CONF_NAME
+    return _resolve_conf_under(str(nginx_root_raw))
+
+
+@lru_cache(maxsize=8)
+def _resolve_conf_under(nginx_root: str) -> Path:
+    """nginx_root 文字列ごとに expanduser().resolve() の結果をキャッシュ（rerun 毎の readlink を省く）"""
+    return Path(nginx_root).expanduser().resolve() / DEFAULT_CONF_NAME
+
+
+def file_summary(p: Path) -> Optional[Tuple[int, str, str]]:
+    """
+    stat を 1 回だけ呼び、(サイズ, 'YYYY-mm-dd HH:MM:SS TZ', 'YYYY-mm-dd HH:MM:SS') を返す。
+    ファイルが無ければ None。
+    """
+    try:
+        st_ = p.stat()
+    except FileNotFoundError:
+        return None
+    mtime = datetime.fromtimestamp(st_.st_mtime, tz=timezone.utc).astimezone()
+    return (
+        st_.st_size,
+        mtime.strftime("%Y-%m-%d %H:%M:%S %Z"),
+        time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(st_.st_mtime)),
+    )
 
 
 def stat_text(p: Path) -> str:
-    if not p.exists():
+    summary = file_summary(p)
+    if summary is None:
         return "（ファイルなし）"
-    st_ = p.stat()
-    sz = st_.st_size
-    mtime = datetime.fromtimestamp(st_.st_mtime, tz=timezone.utc).astimezone()
-    return f"{sz:,} bytes\n最終更新: {mtime.strftime('%Y-%m-%d %H:%M:%S %Z')}"
+    sz, mtime_tz, _ = summary
+    return f"{sz:,} bytes\n最終更新: {mtime_tz}"
 
 
-def atomic_write(path: Path, data: str) -> None:
-    """原子書き込み（tmpに書いてから置換）"""
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """原子書き込み（エンコード済み bytes をそのまま tmp に書いてから置換）"""
     tmp = path.with_suffix(path.suffix + ".tmp")
-    with tmp.open("w", encoding="utf-8", newline="\n") as f:
+    with tmp.open("wb") as f:
         f.write(data)
         f.flush()
         os.fsync(f.fileno())
     tmp.replace(path)
 
 
+def atomic_write(path: Path, data: str) -> None:
+    """原子書き込み（tmpに書いてから置換）。utf-8 に 1 回だけエンコードして bytes 版に渡す"""
+    atomic_write_bytes(path, data.encode("utf-8"))
+
+
+_clonefile_fn = None  # macOS libc.clonefile（未解決: None / 使えない: False）
+
+
+def _clonefile(src: Path, dst: Path) -> bool:
+    """
+    macOS(APFS) の clonefile(2) でコピーオンライトの複製を作る。
+    メタデータ（パーミッション・mtime）も引き継がれる。使えない環境・失敗時は False。
+    """
+    global _clonefile_fn
+    if _clonefile_fn is None:
+        _clonefile_fn = False
+        if sys.platform == "darwin":
+            try:
+                import ctypes
+                fn = ctypes.CDLL(None, use_errno=True).clonefile
+                fn.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint32]
+                fn.restype = ctypes.c_int
+                _clonefile_fn = fn
+            except (OSError, AttributeError):
+                pass
+    if not _clonefile_fn:
+        return False
+    return _clonefile_fn(os.fsencode(src), os.fsencode(dst), 0) == 0
+
+
 def make_backup(path: Path) -> Path:
     ts = datetime.now().strftime("%Y%m%d-%H%M%S")
     backup = path.with_suffix(path.suffix + f".bak.{ts}")
-    shutil.copy2(path, backup)
+    if not _clonefile(path, backup):
+        import shutil
+        shutil.copy2(path, backup)
     return backup
 
 
@@ -187,18 +254,24 @@ def generate_conf_dry_run(py_exe: str = None) -> Tuple[int, str]:
             [py, str(gen), "--dry-run"],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,   # ここでは混ぜない
-            text=True,
             check=False,
         )
-        return p.returncode, (p.stdout or "")
+        return p.returncode, p.stdout.decode("utf-8", "replace")
     except Exception as e:
         return 1, f"[Exception] {e}"
 
 
+@lru_cache(maxsize=16)
 def diff_current_vs_generated(current_text: str, generated_text: str) -> str:
-    """unified diff のテキストを返す"""
-    import difflib
-    return "".join(difflib.unified_diff(
+    """
+    unified diff のテキストを返す。
+    同じ入力の組は rerun をまたいでキャッシュを返す（difflib は行数の積に比例して重い）。
+    """
+    try:
+        from difflib_rs import unified_diff  # type: ignore  # 任意：Rust 実装（同じシグネチャ）
+    except ImportError:
+        from difflib import unified_diff
+    return "".join(unified_diff(
         current_text.splitlines(keepends=True),
         generated_text.splitlines(keepends=True),
         fromfile="(current nginx.conf)",
@@ -211,8 +284,9 @@ def current_head(conf_path: Path, lines: int = 15) -> str:
     if not conf_path.exists():
         return ""
     try:
-        txt = conf_path.read_text(encoding="utf-8", errors="replace")
-        return "\n".join(txt.splitlines()[:lines])
+        # 先頭 lines 行だけを読み、ファイル全体は読み込まない
+        with conf_path.open("r", encoding="utf-8", errors="replace") as f:
+            return "\n".join(ln.rstrip("\n") for ln in islice(f, lines))
     except Exception:
         return ""
 
@@ -249,28 +323,49 @@ def pgrep_nginx() -> str:
     return out
 
 
+def _lsof_listen_nginx(port: int) -> str:
+    """lsof で LISTEN 中のソケットを列挙し、nginx の行だけを返す（grep の代わりに Python で絞り込む）。"""
+    _, out = run_cmd(["lsof", "-nP", f"-iTCP:{int(port)}", "-sTCP:LISTEN"])
+    return "".join(line for line in out.splitlines(keepends=True) if "nginx" in line)
+
+
 def lsof_port_80() -> str:
-    _, out = run_cmd("lsof -nP -iTCP:80 -sTCP:LISTEN | grep nginx || true", shell=True)
-    return out
+    return _lsof_listen_nginx(80)
 
 
-def tail_log(path: str, n: int) -> str:
-    if not os.path.exists(path):
+def tail_log(path: str, n: int, block: int = 8192) -> str:
+    """
+    ファイル末尾 n 行を返す（tail を起動せず、末尾から block バイトずつ遡って読む）。
+    ファイルが無い/読めない場合は空文字。
+    """
+    n = int(n)
+    if n <= 0:
         return ""
-    _, out = run_cmd(f"tail -n {int(n)} {path}", shell=True)
-    return out
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            buf = b""
+            # 末尾の改行を除いて n 行ぶんの区切りが見つかるまで遡る
+            while pos > 0 and buf.count(b"\n") <= n:
+                size = min(block, pos)
+                pos -= size
+                f.seek(pos)
+                buf = f.read(size) + buf
+    except OSError:
+        return ""
+    lines = buf.splitlines()[-n:]
+    return (b"\n".join(lines) + b"\n").decode("utf-8", "replace") if lines else ""
 
 
 def mtime_str(p: Path) -> str:
-    if not p.exists():
-        return "-"
-    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(p.stat().st_mtime))
+    summary = file_summary(p)
+    return summary[2] if summary is not None else "-"
 
 
 # ========= HTTPS 補助 =========
 def lsof_port_443() -> str:
-    _, out = run_cmd("lsof -nP -iTCP:443 -sTCP:LISTEN | grep nginx || true", shell=True)
-    return out
+    return _lsof_listen_nginx(443)
 
 
 def create_self_signed_cert(
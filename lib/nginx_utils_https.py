@@ -10,6 +10,7 @@ from lib.nginx_utils import (  # type: ignore
     resolve_nginx_conf_path,
     stat_text,
     atomic_write,
+    atomic_write_bytes,
     make_backup,
     run_cmd,
     diff_current_vs_generated,
@@ -1,14 +1,28 @@
 # lib/nginx_utils_new.py
 
 from __future__ import annotations
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
+import copy
+import os
 import subprocess
 import datetime as dt
-import difflib
 import shutil
-import toml
 import sys
 
+# unified diff：Rust 実装の difflib_rs が入っていれば使い、なければ標準の difflib
+try:
+    from difflib_rs import unified_diff  # type: ignore
+except ImportError:
+    from difflib import unified_diff
+
+# TOML パーサ：Rust 実装の toml_rs が入っていれば使い、なければ標準の tomllib
+try:
+    import toml_rs as _toml  # type: ignore
+except ImportError:
+    import tomllib as _toml
+
 # ========= パス系 =========
 SETTINGS_FILE = ".streamlit/settings.toml"
 
@@ -33,28 +47,43 @@ http {
 """
 
 # ========= ヘルパ =========
+@lru_cache(maxsize=8)
+def _load_settings_cached(path_str: str, mtime_ns: int) -> dict:
+    return _toml.loads(Path(path_str).read_bytes().decode("utf-8"))
+
 def load_settings(path: Path) -> dict:
-    data = toml.loads(path.read_text(encoding="utf-8"))
-    return data
+    """
+    settings.toml を読み込む。(パス, mtime_ns) をキーにキャッシュし、
+    ファイルが更新されるまで再パースしない。戻り値は呼び出し側で書き換えてもよいようコピーを返す。
+    """
+    data = _load_settings_cached(str(path), path.stat().st_mtime_ns)
+    return copy.deepcopy(data)
+
+@lru_cache(maxsize=8)
+def _resolve_nginx_conf_path_cached(conf_path: str, env: str, nginx_root: str) -> Path:
+    if conf_path:
+        return Path(conf_path).expanduser().resolve()
+    if nginx_root:
+        return Path(nginx_root, "nginx.conf").expanduser().resolve()
+    return Path("/opt/homebrew/etc/nginx/nginx.conf").resolve()
 
 def resolve_nginx_conf_path(settings: dict) -> Path:
     """
     1) settings.nginx.conf_path 明示
     2) locations.<env>.nginx_root + '/nginx.conf'
     3) Homebrew 既定
+    判定に使う値の組をキーにキャッシュする（resolve() のファイルシステム参照を繰り返さない）。
     """
     nginx = (settings.get("nginx") or {})
-    if nginx.get("conf_path"):
-        return Path(nginx["conf_path"]).expanduser().resolve()
+    conf_path = nginx.get("conf_path") or ""
 
-    env = (settings.get("env") or {}).get("location")
+    env = (settings.get("env") or {}).get("location") or ""
     locs = settings.get("locations") or {}
+    nginx_root = ""
     if env and isinstance(locs.get(env), dict):
-        root = (locs[env].get("nginx_root") or "").strip()
-        if root:
-            return Path(root, "nginx.conf").expanduser().resolve()
+        nginx_root = (locs[env].get("nginx_root") or "").strip()
 
-    return Path("/opt/homebrew/etc/nginx/nginx.conf").resolve()
+    return _resolve_nginx_conf_path_cached(str(conf_path), str(env), nginx_root)
 
 def stat_text(conf_path: Path) -> str:
     p = conf_path
@@ -65,9 +94,16 @@ def stat_text(conf_path: Path) -> str:
     return f"path: {p}\nsize: {s.st_size} bytes\nmtime: {mtime}"
 
 def atomic_write(path: Path, content: str, encoding="utf-8") -> None:
-    tmp = path.with_suffix(path.suffix + ".tmp")
-    tmp.write_text(content, encoding=encoding)
-    tmp.replace(path)
+    # エンコード済み bytes を os.write で直接書き、os.replace で置き換える
+    data = memoryview(content.encode(encoding))
+    tmp = str(path) + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
 
 def make_backup(path: Path) -> Path:
     ts = dt.datetime.now().strftime("%Y%m%d-%H%M%S")
@@ -77,8 +113,8 @@ def make_backup(path: Path) -> Path:
 
 def run_cmd(cmd: list[str]) -> tuple[int, str]:
     try:
-        proc = subprocess.run(cmd, capture_output=True, text=True)
-        out = (proc.stdout or "") + (proc.stderr or "")
+        proc = subprocess.run(cmd, capture_output=True)
+        out = (proc.stdout + proc.stderr).decode("utf-8", "replace")
         return proc.returncode, out
     except Exception as e:
         return 1, f"[run_cmd error] {e}"
@@ -90,7 +126,7 @@ def generate_conf_dry_run() -> tuple[int, str]:
     return run_cmd([sys.executable, str(script), "--dry-run"])
 
 def diff_current_vs_generated(current_text: str, generated_text: str) -> str:
-    diff = difflib.unified_diff(
+    diff = unified_diff(
         current_text.splitlines(keepends=True),
         generated_text.splitlines(keepends=True),
         fromfile="current",
@@ -102,7 +138,8 @@ def diff_current_vs_generated(current_text: str, generated_text: str) -> str:
 def current_head(conf_path: Path, n: int = 80) -> str:
     if not conf_path.exists():
         return ""
-    return "".join(conf_path.read_text(encoding="utf-8", errors="replace").splitlines(True)[:n])
+    with conf_path.open("r", encoding="utf-8", errors="replace") as f:
+        return "".join(islice(f, n))
 
 def nginx_test(conf_path: Path) -> tuple[int, str]:
     return run_cmd(["nginx", "-t", "-c", str(conf_path)])
@@ -0,0 +1,48 @@
+"""
+lib/proc.py
+==========================================
+サブプロセス実行の共通ヘルパ
+
+提供機能
+--------
+- runproc(cmd, *, cwd=None, shell=False, timeout=None) -> (returncode, output)
+    stderr を stdout にカーネル側で合流（stderr=STDOUT）させて 1 本のパイプで受け取る。
+    出力は bytes で受け取り utf-8（不正バイトは置換）でデコードする。
+    例外は外に出さず、タイムアウトは 124、その他の例外は 1 を返す。
+
+使用例
+------
+from lib.proc import runproc
+
+code, out = runproc(["nginx", "-t", "-c", str(conf_path)])
+"""
+
+from __future__ import annotations
+import subprocess
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+def runproc(
+    cmd: list[str] | str,
+    *,
+    cwd: Optional[str | Path] = None,
+    shell: bool = False,
+    timeout: Optional[float] = None,
+) -> Tuple[int, str]:
+    """コマンドを実行し (returncode, stdout+stderr) を返す。"""
+    try:
+        p = subprocess.run(
+            cmd,
+            cwd=cwd,
+            shell=shell,
+            timeout=timeout,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        # text=True（TextIOWrapper 経由）ではなく bytes で受けて 1 回だけデコード
+        return p.returncode, p.stdout.decode("utf-8", "replace")
+    except subprocess.TimeoutExpired as e:
+        return 124, f"[Timeout] {e}"
+    except Exception as e:
+        return 1, f"[Exception] {e}"
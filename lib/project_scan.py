@@ -1,14 +1,27 @@
 # lib/project_scan.py
 from __future__ import annotations
-from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+import json
 import re
 import subprocess
-import pandas as pd
+import time
 import os  # ← 追加
 
-from config.path_config import PROJECT_ROOT
+if TYPE_CHECKING:
+    import pandas as pd  # 実行時は apps_git_dataframe 内で遅延インポート
+
+# 任意：libgit2 バインディング。入っていれば git サブプロセスを使わずに状態を読む
+try:
+    import pygit2  # type: ignore
+except ImportError:
+    pygit2 = None
+
+# PROJECT_ROOT は import 時ではなく使うときに解決する（location 未設定でも import は通る）
+import config.path_config as path_config
 
 
 # ============================================================
@@ -44,51 +57,212 @@ class AppRepoInfo:
 # 内部ユーティリティ
 # ============================================================
 
-def _is_git_repo(p: Path) -> bool:
-    """指定パスがGitリポジトリかを確認"""
-    try:
-        r = subprocess.run(
-            ["git", "rev-parse", "--is-inside-work-tree"],
-            cwd=p,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        return r.returncode == 0 and r.stdout.strip() == "true"
-    except Exception:
-        return False
+def _is_git_repo(p: Path | str) -> bool:
+    """
+    指定パスがGitリポジトリかを確認（サブプロセスを使わず .git の有無で判定）
+    .git がファイルの場合（worktree / submodule）も対象に含める。
+    """
+    g = os.path.join(p, ".git")
+    return os.path.isdir(g) or os.path.isfile(g)
 
 
-def _safe_run(cmd: list[str], cwd: Optional[Path]) -> Tuple[int, str, str]:
-    """サブプロセス安全実行（例外を吸収）"""
+def _safe_run(
+    cmd: list[str], cwd: Optional[Path | str], timeout: Optional[float] = None
+) -> Tuple[int, str, str]:
+    """サブプロセス安全実行（例外・タイムアウトを吸収）"""
     try:
-        p = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, check=False)
-        return p.returncode, p.stdout.strip(), p.stderr.strip()
+        # bytes で受けて直接デコード（text=True のラッパ層を通さない）
+        p = subprocess.run(cmd, cwd=cwd, capture_output=True, check=False, timeout=timeout)
+        return (
+            p.returncode,
+            p.stdout.decode("utf-8", "replace").strip(),
+            p.stderr.decode("utf-8", "replace").strip(),
+        )
     except Exception as e:
         return 1, "", f"{type(e).__name__}: {e}"
 
 
-def _format_bytes(n: int) -> str:
-    """バイト数を人間可読に整形（B/KB/MB/GB/TB）"""
-    size = float(n)
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if size < 1024.0 or unit == "TB":
-            return (f"{size:.0f} {unit}" if unit == "B" else f"{size:.2f} {unit}")
-        size /= 1024.0
-    return f"{size:.2f} TB"
+_BYTE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
+def format_bytes(n: int) -> str:
+    """バイト数を人間可読に整形（B/KB/MB/GB/TB）。単位は bit_length から一発で決める"""
+    if n < 1024:
+        return f"{n} B"
+    i = min((n.bit_length() - 1) // 10, len(_BYTE_UNITS) - 1)
+    return f"{n / (1 << (10 * i)):.2f} {_BYTE_UNITS[i]}"
 
 
-def _git_dir_size(repo: Path) -> int:
+# .git の中身が増減する操作で mtime が変わる場所
+# - index: add / reset など、objects/pack: gc / repack / 大きな fetch（パックのまま受け取る）
+# - logs/HEAD: commit / checkout / reset / merge（reflog に追記される）
+# - FETCH_HEAD: fetch / pull の度に書き直される。fetch.unpackLimit 未満の小さな fetch は
+#   既存の objects/xx/ にルーズオブジェクトを置くだけで objects / objects/pack の mtime は変わらない
+# - packed-refs: gc / pack-refs、リモートブランチの削除（fetch --prune）
+_GIT_SIZE_WATCH = (
+    "",
+    "index",
+    "objects",
+    os.path.join("objects", "pack"),
+    os.path.join("logs", "HEAD"),
+    "FETCH_HEAD",
+    "packed-refs",
+)
+
+
+def _git_dir_signature(git_dir: str) -> Tuple[int, ...]:
+    """_GIT_SIZE_WATCH の各パスの mtime_ns の組（無いものは 0）"""
+    sig = []
+    for sub in _GIT_SIZE_WATCH:
+        try:
+            sig.append(os.stat(os.path.join(git_dir, sub)).st_mtime_ns)
+        except OSError:
+            sig.append(0)
+    return tuple(sig)
+
+
+def _git_dir_size(repo: Path | str, estimate: bool = False) -> int:
     """
     repo/.git 配下の合計サイズ（バイト）を返す。
-    例外や権限エラーは無視して続行。
+    .git の mtime の組（_git_dir_signature）が変わらない間は前回の集計を再利用する。
+    estimate=True なら走査せず `git count-objects -v` のオブジェクト容量で見積もる
+    （index / logs / hooks などは含まない。取れなければ通常の集計に戻る）。
     """
-    git_dir = repo / ".git"
-    if not git_dir.exists() or not git_dir.is_dir():
+    git_dir = os.path.join(repo, ".git")
+    if not os.path.isdir(git_dir):
         return 0
+    signature = _git_dir_signature(git_dir)
+    if estimate:
+        size = _git_objects_size_cached(git_dir, signature)
+        if size is not None:
+            return size
+    return _git_dir_size_cached(git_dir, signature)
+
+
+@lru_cache(maxsize=256)
+def _git_objects_size_cached(git_dir: str, _signature: Tuple[int, ...]) -> Optional[int]:
+    """`git count-objects -v` の size + size-pack + size-garbage（KiB）をバイトで返す。失敗時は None"""
+    code, out, _ = _safe_run(["git", "--git-dir", git_dir, "count-objects", "-v"], None, timeout=5)
+    if code != 0:
+        return None
+    kib = 0
+    for line in out.splitlines():
+        key, _, val = line.partition(": ")
+        if key in ("size", "size-pack", "size-garbage") and val.strip().isdigit():
+            kib += int(val)
+    return kib * 1024
+
+
+def _git_dir_size_cached(git_dir: str, signature: Tuple[int, ...]) -> int:
+    """
+    サイズキャッシュ（gitsize.json をメモリに読んだ dict）に同じ signature で
+    _SIZE_CACHE_TTL 以内に集計した値があればそれを返す。
+    無ければ POSIX では `du -sk` 1 回で集計し（C 実装の走査、ブロック単位のディスク使用量）、
+    使えなければ Python で走査する（ファイルサイズの合計）。
+    """
+    global _size_cache_dirty
+    disk = _load_size_cache()
+    hit = disk.get(git_dir)
+    now = time.time()
+    if _size_entry_fresh(hit, now) and hit[0] == list(signature):
+        return hit[1]
+
+    size = None
+    if os.name == "posix":
+        code, out, _ = _safe_run(["du", "-sk", git_dir], None, timeout=5)
+        head = out.split(maxsplit=1)[0] if code == 0 and out else ""
+        if head.isdigit():
+            size = int(head) * 1024
+    if size is None:
+        size = _git_dir_size_scandir(git_dir)
+
+    disk[git_dir] = [list(signature), size, now]
+    _size_cache_dirty = True
+    return size
+
+
+# ---- .git サイズのディスクキャッシュ（プロセス再起動をまたいで du を省く） ----
+# 中身は {git_dir: [signature, size_bytes, 集計時刻(epoch 秒)]}。
+# signature は _git_dir_signature と同じ mtime の組。mtime で拾えない変化もあり得るので、
+# signature が同じでも _SIZE_CACHE_TTL を過ぎた値は使わず集計し直す
+_SIZE_CACHE_TTL = 24 * 60 * 60
+_SIZE_CACHE_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "command-station",
+    "gitsize.json",
+)
+_size_cache: Optional[Dict[str, list]] = None
+_size_cache_dirty = False
+
+
+def _size_entry_fresh(entry, now: float) -> bool:
+    """キャッシュの 1 件が [signature, size, 集計時刻] の形で、_SIZE_CACHE_TTL 以内のものか"""
+    return (
+        isinstance(entry, list)
+        and len(entry) == 3
+        and isinstance(entry[2], (int, float))
+        and 0 <= now - entry[2] < _SIZE_CACHE_TTL
+    )
+
+
+def _load_size_cache() -> Dict[str, list]:
+    """
+    gitsize.json を初回だけ読む（壊れている・無いときは空から始める）。
+    期限切れ・旧形式の項目は読み込み時に捨てる（ファイルが増え続けないように）。
+    """
+    global _size_cache
+    if _size_cache is None:
+        try:
+            with open(_SIZE_CACHE_FILE, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        now = time.time()
+        _size_cache = (
+            {k: v for k, v in data.items() if _size_entry_fresh(v, now)}
+            if isinstance(data, dict)
+            else {}
+        )
+    return _size_cache
+
+
+def _save_size_cache() -> None:
+    """変更があったときだけ gitsize.json を書き出す（一時ファイル + os.replace で置き換え）"""
+    global _size_cache_dirty
+    if not _size_cache_dirty or _size_cache is None:
+        return
+    tmp = f"{_SIZE_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(_SIZE_CACHE_FILE), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_size_cache, f)
+        os.replace(tmp, _SIZE_CACHE_FILE)
+        _size_cache_dirty = False
+    except OSError:
+        # キャッシュなので書けなくても続行（次回 du し直すだけ）
+        pass
+
+
+def clear_git_size_cache() -> None:
+    """.git サイズのキャッシュ（メモリ上の dict / lru とディスクの gitsize.json）を捨てる"""
+    global _size_cache, _size_cache_dirty
+    _git_objects_size_cached.cache_clear()
+    _size_cache = {}
+    _size_cache_dirty = False
+    try:
+        os.remove(_SIZE_CACHE_FILE)
+    except OSError:
+        pass
+
 
+def _git_dir_size_scandir(git_dir: str) -> int:
+    """
+    .git 配下を os.scandir で走査して合計サイズ（バイト）を返す（du が使えない環境用）。
+    例外や権限エラーは無視して続行。
+    """
     total = 0
-    stack: List[Path] = [git_dir]
+    # Path を作らず str のまま積む（DirEntry.path をそのまま使う）
+    stack: List[str] = [git_dir]
     while stack:
         cur = stack.pop()
         try:
@@ -101,7 +275,7 @@ def _git_dir_size(repo: Path) -> int:
                         if entry.is_file(follow_symlinks=False):
                             total += entry.stat(follow_symlinks=False).st_size
                         elif entry.is_dir(follow_symlinks=False):
-                            stack.append(Path(entry.path))
+                            stack.append(entry.path)
                     except Exception:
                         # アクセス不可などは無視
                         pass
@@ -114,9 +288,118 @@ def _git_dir_size(repo: Path) -> int:
 # Git情報取得
 # ============================================================
 
-def git_status_summary(repo: Path) -> dict:
+# `git status -sb` の先頭行: "## <branch>[...<upstream>][ [ahead N, behind M]]"
+_BRANCH_HEADER_RE = re.compile(r"^## (\S+?)(?:\.\.\.(\S+))?(?: \[(.+)\])?$")
+
+
+def _parse_branch_header(header: str) -> Tuple[str, int, int]:
+    """status -sb の先頭行から (branch, ahead, behind) を取り出す"""
+    if header.startswith("## No commits yet on "):
+        return header[len("## No commits yet on "):].strip(), 0, 0
+    if header.startswith("## HEAD (no branch)"):
+        return "HEAD", 0, 0
+
+    m = _BRANCH_HEADER_RE.match(header)
+    if not m:
+        return "", 0, 0
+    branch, _upstream, track = m.groups()
+    ahead = behind = 0
+    # track は "ahead N" / "behind M" / "ahead N, behind M" / "gone" の固定書式なので split で足りる
+    for part in (track or "").split(", "):
+        kind, _, num = part.partition(" ")
+        if not num.isdigit():
+            continue
+        if kind == "ahead":
+            ahead = int(num)
+        elif kind == "behind":
+            behind = int(num)
+    return branch, ahead, behind
+
+
+def _status_xy(flags: int) -> str:
+    """pygit2 の status フラグ（WT_NEW 以外）を porcelain v1 の 2 文字（XY）に変換"""
+    if flags & pygit2.GIT_STATUS_CONFLICTED:
+        return "UU"
+    x = y = " "
+    for flag, code in (
+        (pygit2.GIT_STATUS_INDEX_NEW, "A"),
+        (pygit2.GIT_STATUS_INDEX_MODIFIED, "M"),
+        (pygit2.GIT_STATUS_INDEX_DELETED, "D"),
+        (pygit2.GIT_STATUS_INDEX_RENAMED, "R"),
+        (pygit2.GIT_STATUS_INDEX_TYPECHANGE, "T"),
+    ):
+        if flags & flag:
+            x = code
+            break
+    for flag, code in (
+        (pygit2.GIT_STATUS_WT_MODIFIED, "M"),
+        (pygit2.GIT_STATUS_WT_DELETED, "D"),
+        (pygit2.GIT_STATUS_WT_RENAMED, "R"),
+        (pygit2.GIT_STATUS_WT_TYPECHANGE, "T"),
+    ):
+        if flags & flag:
+            y = code
+            break
+    return x + y
+
+
+def _git_status_summary_pygit2(repo: Path | str) -> Optional[dict]:
+    """
+    pygit2 で git_status_summary と同じ情報をプロセス内で取得する。
+    short_status は `git status -sb` と同じ書式で組み立てる。失敗時は None（サブプロセス版へ）。
+    """
+    try:
+        r = pygit2.Repository(str(repo))
+        if r.is_bare:
+            return None
+
+        ahead = behind = 0
+        if r.head_is_unborn:
+            branch = r.references["HEAD"].target.removeprefix("refs/heads/")
+            header = f"## No commits yet on {branch}"
+        elif r.head_is_detached:
+            branch = "HEAD"
+            header = "## HEAD (no branch)"
+        else:
+            branch = r.head.shorthand
+            header = f"## {branch}"
+            upstream = r.branches.local[branch].upstream
+            if upstream is not None:
+                header += f"...{upstream.shorthand}"
+                ahead, behind = r.ahead_behind(r.head.target, upstream.target)
+                track = ", ".join(
+                    f"{k} {v}" for k, v in (("ahead", ahead), ("behind", behind)) if v
+                )
+                if track:
+                    header += f" [{track}]"
+
+        # porcelain と同じく、追跡ファイルの変更 → 未追跡（??）の順にパス順で並べる
+        tracked: List[str] = []
+        untracked: List[str] = []
+        for path, flags in sorted(r.status(untracked_files="normal").items()):
+            # index から消して作業ツリーに残したファイルは "D " と "??" の 2 行になる
+            if flags & pygit2.GIT_STATUS_WT_NEW:
+                untracked.append(f"?? {path}")
+                flags &= ~pygit2.GIT_STATUS_WT_NEW
+            if flags:
+                tracked.append(f"{_status_xy(flags)} {path}")
+        changes = tracked + untracked
+    except Exception:
+        return None
+
+    return {
+        "branch": branch,
+        "dirty": len(changes),
+        "ahead": ahead,
+        "behind": behind,
+        "short_status": "\n".join([header, *changes]),
+        "is_repo": True,
+    }
+
+
+def git_status_summary(repo: Path | str) -> dict:
     """
-    指定リポジトリの主要Git情報を取得
+    指定リポジトリの主要Git情報を `git status -sb --porcelain=v1` 1 回で取得
     - branch: 現在のブランチ名
     - dirty: 未コミット変更ファイル数
     - ahead/behind: upstreamとの差分
@@ -129,33 +412,31 @@ def git_status_summary(repo: Path) -> dict:
         "ahead": 0,
         "behind": 0,
         "short_status": "",
-        "is_repo": _is_git_repo(repo),
+        "is_repo": False,
     }
-    if not info["is_repo"]:
+
+    # .git が無ければ git を起動しない
+    if not _is_git_repo(repo):
         return info
 
-    # ブランチ名
-    _, out, _ = _safe_run(["git", "rev-parse", "--abbrev-ref", "HEAD"], repo)
-    info["branch"] = out or ""
-
-    # 未コミットファイル数
-    _, out, _ = _safe_run(["git", "status", "--porcelain=v1"], repo)
-    info["dirty"] = len(out.splitlines()) if out else 0
-
-    # upstream との ahead/behind
-    code, out, _ = _safe_run(["git", "rev-parse", "--abbrev-ref", "@{u}"], repo)
-    if code == 0 and out:
-        code2, out2, _ = _safe_run(["git", "rev-list", "--left-right", "--count", "@{u}...HEAD"], repo)
-        if code2 == 0 and out2:
-            parts = re.split(r"\s+", out2.strip())
-            if len(parts) >= 2:
-                info["behind"] = int(parts[0])
-                info["ahead"] = int(parts[1])
-
-    # 短縮ステータス
-    _, out, _ = _safe_run(["git", "status", "-sb"], repo)
+    # pygit2 があればサブプロセスなしで取得
+    if pygit2 is not None:
+        fast = _git_status_summary_pygit2(repo)
+        if fast is not None:
+            return fast
+
+    code, out, _ = _safe_run(["git", "--no-optional-locks", "status", "-sb", "--porcelain=v1"], repo)
+    if code != 0:
+        return info
+    info["is_repo"] = True
     info["short_status"] = out or ""
 
+    lines = out.splitlines()
+    if lines and lines[0].startswith("## "):
+        info["branch"], info["ahead"], info["behind"] = _parse_branch_header(lines[0])
+        lines = lines[1:]
+    info["dirty"] = len(lines)
+
     return info
 
 
@@ -163,119 +444,179 @@ def git_status_summary(repo: Path) -> dict:
 # アプリ探索
 # ============================================================
 
-def discover_apps(project_root: Path = PROJECT_ROOT) -> List[AppDir]:
+def _scan_dirs(parent, suffix: str) -> List[os.DirEntry]:
+    """parent 直下で名前が suffix で終わるディレクトリを名前順で返す（存在しなければ空）"""
+    try:
+        with os.scandir(parent) as it:
+            found = [e for e in it if e.name.endswith(suffix) and e.is_dir()]
+    except OSError:
+        return []
+    found.sort(key=lambda e: e.name)
+    return found
+
+
+def _tree_signature(root: str) -> Optional[Tuple[int, ...]]:
+    """
+    project_root と直下の *_project の mtime_ns の組。
+    *_project / *_app / apps_portal などの追加・削除・改名でディレクトリの mtime が変わるので、
+    これが同じ間は探索結果も変わらない（root が無ければ None）。
+    """
+    try:
+        sig = [os.stat(root).st_mtime_ns]
+    except OSError:
+        return None
+    for proj in _scan_dirs(root, "_project"):
+        try:
+            sig.append(proj.stat().st_mtime_ns)
+        except OSError:
+            sig.append(0)
+    return tuple(sig)
+
+
+def discover_apps(project_root: Optional[Path] = None) -> List[AppDir]:
+    """
+    *_project/*_app と apps_portal / common_lib / command_files を列挙する。
+    ディレクトリ構成（mtime の組）が変わらない間は前回の結果を再利用する（rerun 毎の再走査を省く）。
+    project_root 省略時は settings の PROJECT_ROOT（このとき初めて解決する）。
+    """
+    root = str(project_root if project_root is not None else path_config.PROJECT_ROOT)
+    return list(_discover_apps_cached(root, _tree_signature(root)))
+
+
+@lru_cache(maxsize=4)
+def _discover_apps_cached(root: str, _signature: Optional[Tuple[int, ...]]) -> Tuple[AppDir, ...]:
+    return tuple(_discover_apps_uncached(Path(root)))
+
+
+# project_root 直下で *_project 以外に Git 対象とするフォルダ（名前, kind）
+_EXTRA_DIRS = (
+    ("apps_portal", "portal"),
+    ("common_lib", "lib"),       # "shared" 等でも可
+    ("command_files", "files"),  # "lib" や他の分類名でもOK
+)
+
+
+def _discover_apps_uncached(project_root: Path) -> List[AppDir]:
     results: List[AppDir] = []
 
-    # *_project/*_app を探索
-    for proj in sorted(project_root.glob("*_project")):
-        if not proj.is_dir():
-            continue
+    # project_root の直下は 1 回の os.scandir で読み、*_project と固定フォルダを同じ一覧から拾う
+    # （固定フォルダごとの is_dir() で stat を重ねない）
+    try:
+        with os.scandir(project_root) as it:
+            top = {e.name: e for e in it if e.is_dir()}
+    except OSError:
+        top = {}
+
+    # *_project/*_app を探索（os.scandir の DirEntry で種別判定し、余分な stat を省く）
+    for name in sorted(n for n in top if n.endswith("_project")):
+        proj = top[name]
+        proj_path = Path(proj.path)
         # プロジェクト直下の *_app を探索（app.py がなくてもOK）
-        for app_dir in sorted(proj.glob("*_app")):
-            if app_dir.is_dir():
-                results.append(
-                    AppDir(
-                        name=app_dir.name,
-                        app_path=app_dir,
-                        project_path=proj,
-                        kind="app",
-                    )
+        for app_dir in _scan_dirs(proj.path, "_app"):
+            results.append(
+                AppDir(
+                    name=app_dir.name,
+                    app_path=Path(app_dir.path),
+                    project_path=proj_path,
+                    kind="app",
                 )
-
-    # apps_portal も対象に含める
-    portal = project_root / "apps_portal"
-    if portal.exists() and portal.is_dir():
-        results.append(
-            AppDir(
-                name="apps_portal",
-                app_path=portal,
-                project_path=portal,
-                kind="portal",
             )
-        )
 
-    # common_lib も対象に含める
-    shared = project_root / "common_lib"
-    if shared.exists() and shared.is_dir():
-        results.append(
-            AppDir(
-                name="common_lib",
-                app_path=shared,
-                project_path=shared,
-                kind="lib",   # "shared" 等でも可
-            )
-        )
+    # apps_portal / common_lib / command_files も対象に含める
+    for name, kind in _EXTRA_DIRS:
+        if name in top:
+            path = Path(top[name].path)
+            results.append(AppDir(name=name, app_path=path, project_path=path, kind=kind))
 
-    # command_files も対象に含める
-    cmd_files = project_root / "command_files"
-    if cmd_files.exists() and cmd_files.is_dir():
-        results.append(
-            AppDir(
-                name="command_files",
-                app_path=cmd_files,
-                project_path=cmd_files,
-                kind="files",  # "lib" や他の分類名でもOK
-            )
-        )
+    return results
 
 
-    return results
+def git_state_fingerprint(project_root: Optional[Path] = None) -> Tuple[int, ...]:
+    """
+    探索対象の .git/HEAD と .git/index の mtime_ns を並べた組（stat だけで作れる軽い指紋）。
+    commit / add / checkout / pull などで変わるので、表示キャッシュのキーに混ぜて使う
+    （作業ツリーだけの編集では変わらないため、キャッシュ側の ttl と併用する）。
+    """
+    sig: List[int] = []
+    for app in discover_apps(project_root):
+        git_dir = os.path.join(app.app_path, ".git")
+        for name in ("HEAD", "index"):
+            try:
+                sig.append(os.stat(os.path.join(git_dir, name)).st_mtime_ns)
+            except OSError:
+                sig.append(-1)
+    return tuple(sig)
 
 
 # ============================================================
 # Git情報付き探索
 # ============================================================
 
-def discover_apps_with_git(project_root: Path = PROJECT_ROOT) -> List[AppRepoInfo]:
+def _collect_one(app: AppDir, estimate_size: bool = False) -> AppRepoInfo:
+    """1 ディレクトリ分の Git 情報と .git サイズを集める（estimate_size は _git_dir_size の estimate）"""
+    # str 化は 1 回だけ（以降の os.path / subprocess / pygit2 呼び出しで使い回す）
+    repo = str(app.app_path)
+    info = git_status_summary(repo)
+
+    # .git のサイズを計算（非リポジトリは 0）
+    size_bytes = _git_dir_size(repo, estimate_size) if info["is_repo"] else 0
+    size_human = format_bytes(size_bytes)
+
+    return AppRepoInfo(
+        name=app.name,
+        path=app.app_path,
+        kind=app.kind,
+        branch=info["branch"],
+        dirty=info["dirty"],
+        ahead=info["ahead"],
+        behind=info["behind"],
+        short_status=info["short_status"],
+        is_repo=info["is_repo"],
+        git_size_bytes=size_bytes,
+        git_size_human=size_human,
+    )
+
+
+def discover_apps_with_git(
+    project_root: Optional[Path] = None, estimate_size: bool = False
+) -> List[AppRepoInfo]:
     """
     *_project 配下の *_app / apps_portal / common_lib を探索し、
     各ディレクトリについて Git 情報と .git サイズを付加した一覧を返す。
+    estimate_size=True なら .git サイズは `git count-objects -v` による見積もり。
     """
     apps = discover_apps(project_root)
-    results: List[AppRepoInfo] = []
-
-    for app in apps:
-        info = git_status_summary(app.app_path)
-
-        # .git のサイズを計算（非リポジトリは 0）
-        size_bytes = _git_dir_size(app.app_path) if info["is_repo"] else 0
-        size_human = _format_bytes(size_bytes)
-
-        results.append(
-            AppRepoInfo(
-                name=app.name,
-                path=app.app_path,
-                kind=app.kind,
-                branch=info["branch"],
-                dirty=info["dirty"],
-                ahead=info["ahead"],
-                behind=info["behind"],
-                short_status=info["short_status"],
-                is_repo=info["is_repo"],
-                git_size_bytes=size_bytes,
-                git_size_human=size_human,
-            )
-        )
+    if not apps:
+        return []
 
-    return results
+    # git サブプロセスと .git 走査は I/O 待ち（fork/exec と読み込み中は GIL を離す）なので
+    # スレッドで並列化する。ex.map は入力順で結果を返すので一覧の順序は apps のまま
+    # 待ちが主体なので CPU 数の 4 倍まで広げる（上限 32、リポジトリ数より多くは作らない）
+    _load_size_cache()  # スレッドから読む前に 1 回だけ読み込んでおく
+    workers = min(32, (os.cpu_count() or 4) * 4, len(apps))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        infos = list(ex.map(partial(_collect_one, estimate_size=estimate_size), apps))
+    _save_size_cache()
+    return infos
 
 
 # ============================================================
 # DataFrame化ヘルパー
 # ============================================================
 
-def apps_git_dataframe(project_root: Path = PROJECT_ROOT) -> pd.DataFrame:
+def apps_git_dataframe(
+    project_root: Optional[Path] = None, estimate_size: bool = False
+) -> pd.DataFrame:
     """
     Git情報付きアプリ一覧を pandas.DataFrame で返す。
     列:
       name, path, kind, branch, dirty, ahead, behind, short_status, is_repo,
       git_size_bytes, git_size_human
+    estimate_size は discover_apps_with_git と同じ（.git サイズを見積もりで済ませる）。
     """
-    rows = [asdict(r) for r in discover_apps_with_git(project_root)]
-    if not rows:
-        return pd.DataFrame(columns=[
-            "name", "path", "kind", "branch", "dirty",
-            "ahead", "behind", "short_status", "is_repo",
-            "git_size_bytes", "git_size_human",
-        ])
-    return pd.DataFrame(rows)
+    import pandas as pd  # DataFrame が必要なときだけ読み込む（起動時間短縮）
+
+    infos = discover_apps_with_git(project_root, estimate_size)
+    # 行ごとの asdict ではなく列ごとのリストを直接組み立てる（0 件でも列は揃う）
+    cols = {f.name: [getattr(r, f.name) for r in infos] for f in fields(AppRepoInfo)}
+    return pd.DataFrame(cols)
@@ -0,0 +1,50 @@
+"""
+lib/toml_cache.py
+==========================================
+TOML 読み込みの共通キャッシュ（tomllib）
+
+提供機能
+--------
+- load_toml(path: Path, mtime_ns: int | None = None) -> dict
+    TOML ファイルを tomllib で読み込む。
+    (パス, mtime_ns) をキーにキャッシュするので、ファイルが更新されない限り再パースしない。
+
+注意
+----
+戻り値はキャッシュと共有されるため、呼び出し側で書き換える場合はコピーしてから使うこと。
+
+使用例
+------
+from lib.toml_cache import load_toml
+
+settings = load_toml(Path(".streamlit/settings.toml"))
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+import tomllib
+
+
+@lru_cache(maxsize=8)
+def _parse_toml_cached(path_str: str, mtime_ns: int) -> Dict[str, Any]:
+    """bytes で一括読込してからパース（パース中にファイルハンドルを保持しない）。"""
+    raw = Path(path_str).read_bytes()
+    return tomllib.loads(raw.decode("utf-8"))
+
+
+def load_toml(path: Path, mtime_ns: Optional[int] = None) -> Dict[str, Any]:
+    """
+    TOML を読み込んで dict を返す。
+
+    Parameters
+    ----------
+    path : Path
+        読み込む TOML ファイル
+    mtime_ns : int, optional
+        呼び出し側で stat 済みなら渡す（stat の重複を避ける）
+    """
+    if mtime_ns is None:
+        mtime_ns = path.stat().st_mtime_ns
+    return _parse_toml_cached(str(path), mtime_ns)
@@ -1,14 +1,25 @@
 # pages/03_プロジェクト走査とGit操作.py
 from __future__ import annotations
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import os
 import shlex
+import shutil
+import threading
+import time
 import streamlit as st
 import pandas as pd
 
 from config.path_config import PROJECT_ROOT
-from lib.cmd_utils import git
+from lib.cmd_utils import git, git_many, git_stream
 from lib.ui_utils import thick_divider
-from lib.project_scan import apps_git_dataframe
+from lib.project_scan import (
+    apps_git_dataframe,
+    clear_git_size_cache,
+    format_bytes,
+    git_state_fingerprint,
+)
 
 # ------------------------------------------------------------
 # ページ設定
@@ -37,19 +48,243 @@ if AUTO_FETCH_STATE_KEY not in st.session_state:
 # ------------------------------------------------------------
 # 0) ユーティリティ
 # ------------------------------------------------------------
+# clone 先にあっても「空」とみなす名前（呼び出しごとに作り直さない）
+_EMPTY_DIR_ALLOWED = frozenset({".DS_Store", ".gitkeep", ".venv", ".run", "__pycache__"})
+
 def _dir_is_effectively_empty(path: Path) -> bool:
     """
     clone 先の中身が「実質的に空」か判定。
     許容: .DS_Store / .gitkeep / .venv / .run / __pycache__
     それ以外があれば NG（安全のため）
     """
-    allowed = {".DS_Store", ".gitkeep", ".venv", ".run", "__pycache__"}
-    if not path.exists():
+    try:
+        # 名前だけ見れば足りるので Path を作らず scandir の entry.name で判定
+        # all() は許容外の名前を見つけた時点で打ち切る
+        with os.scandir(path) as it:
+            return all(e.name in _EMPTY_DIR_ALLOWED for e in it)
+    except FileNotFoundError:
         return True
-    for p in path.iterdir():
-        if p.name not in allowed:
-            return False
-    return True
+
+STREAM_TAIL_LINES = 200  # 流し表示で保持・再描画する末尾の行数
+# サブモジュールの clone / fetch を並列に走らせる数（--jobs / submodule.fetchJobs）
+GIT_JOBS = max(2, (os.cpu_count() or 4) * 3 // 4)
+
+def _git_stream_code(args, cwd) -> int:
+    """
+    git の出力を 1 行ずつ st.code に流す（長い clone でも途中経過が見える）。戻り値は終了コード。
+    保持・再描画するのは末尾 STREAM_TAIL_LINES 行だけ（出力が長くても 1 行ごとの描画コストとメモリが一定）。
+    """
+    placeholder = st.empty()
+    lines: deque[str] = deque(maxlen=STREAM_TAIL_LINES)
+
+    def _show(line: str) -> None:
+        lines.append(line)
+        placeholder.code("".join(lines), language="bash")
+
+    code = git_stream(args, _show, cwd=cwd)
+    if not lines:
+        placeholder.code("(no output)", language="bash")
+    return code
+
+def _nothing_staged(repo_path) -> bool:
+    """ステージ済みの変更が無いか（`diff --cached --quiet` は差分なしで 0 を返す）"""
+    code, _, _ = git(["diff", "--cached", "--quiet"], cwd=repo_path)
+    return code == 0
+
+def _commit_one(repo_path, add_pattern: str, commit_msg: str, do_push: bool) -> list[tuple[str, str]]:
+    """
+    1 リポジトリ分の add → commit →（push）を実行する（スレッドから呼ぶので st.* は使わない）。
+    表示用に ("code" | "info" | "error", テキスト) のリストを返す（_render_logs で表示）。
+    """
+    logs: list[tuple[str, str]] = []
+    code, out, err = git(["add", *shlex.split(add_pattern)], cwd=repo_path)
+    logs.append(("code", out or err or "(no output)"))
+    if code != 0:
+        # pathspec 不一致などで add できなければ commit / push は打たない
+        logs.append(("error", "git add に失敗したため commit をスキップ。"))
+        return logs
+    # 事前の diff --cached は打たずに commit し、失敗したときだけ「ステージなし」かを確かめる
+    # メッセージは argv ではなく標準入力で渡す（複数行・長文でもそのまま）
+    code, out, err = git(["commit", "-F", "-"], cwd=repo_path, stdin=commit_msg.encode("utf-8"))
+    if code != 0 and _nothing_staged(repo_path):
+        logs.append(("info", "ステージされた変更がありません。commit をスキップ。"))
+        return logs
+    logs.append(("code", out or err or "(no output)"))
+    if code != 0:
+        # hook 失敗などでコミットできなかったときは push しない
+        if do_push:
+            logs.append(("error", "git commit に失敗したため push をスキップ。"))
+        return logs
+    if do_push:
+        code, out, err = git(["push"], cwd=repo_path)
+        logs.append(("code", out or err or "(no output)"))
+    return logs
+
+def _reset_one(repo_path, repo_name: str, branch: str) -> list[tuple[str, str]]:
+    """1 リポジトリ分の fetch origin → reset --hard origin/<branch>（スレッドから呼ぶ）。"""
+    # origin 設定確認
+    code_r, out_r, err_r = git(["remote"], cwd=repo_path)
+    if code_r != 0 or "origin" not in (out_r or ""):
+        return [("error", "origin が設定されていないためスキップ（`git remote add origin ...` が必要）")]
+
+    # fetch → reset --hard
+    logs: list[tuple[str, str]] = []
+    code1, out1, err1 = git(["fetch", "origin"], cwd=repo_path)
+    logs.append(("code", out1 or err1 or "(no output)"))
+
+    code2, out2, err2 = git(["reset", "--hard", f"origin/{branch}"], cwd=repo_path)
+    logs.append(("code", out2 or err2 or "(no output)"))
+
+    if code1 == 0 and code2 == 0:
+        logs.append(("success", f"✅ {repo_name}: origin/{branch} に強制同期しました。"))
+    else:
+        logs.append(("error", f"❌ {repo_name}: リセットに失敗しました。ログを確認してください。"))
+    return logs
+
+def _first_push_one(repo_path, remote_name: str, target: str) -> list[tuple[str, str]]:
+    """1 リポジトリ分の上流確認 → push -u <remote> <target>（スレッドから呼ぶ）。"""
+    code, _, _ = git(["rev-parse", "--abbrev-ref", "--symbolic-full-name", "@{u}"], cwd=repo_path)
+    if code == 0:
+        return [("info", "すでに上流ブランチが設定されています。通常の push を利用してください。")]
+
+    logs: list[tuple[str, str]] = [("caption", "上流ブランチが未設定 → push -u を実行します。")]
+    code, out, err = git(["push", "-u", remote_name, target], cwd=repo_path)
+    logs.append(("code", out or err or "(no output)"))
+    return logs
+
+def _init_one(repo_path: Path, remote_url: str, auto_commit: bool) -> list[tuple[str, str]]:
+    """1 フォルダ分の git init →（.gitignore 作成）→（remote add）→（初回 commit）（スレッドから呼ぶ）。"""
+    code, out, err = git(["init"], cwd=repo_path)
+    logs: list[tuple[str, str]] = [("code", out or err or "(no output)")]
+
+    # .gitignore 自動作成
+    gi = repo_path / ".gitignore"
+    if not gi.exists():
+        gi.write_text(".venv/\n__pycache__/\n.DS_Store\n.git.trash.*/\n")
+        logs.append(("info", ".gitignore を自動作成しました。"))
+
+    if remote_url:
+        git(["remote", "add", "origin", remote_url], cwd=repo_path)
+    if auto_commit:
+        git(["add", "."], cwd=repo_path)
+        git(["commit", "-m", "Initial commit"], cwd=repo_path)
+    logs.append(("success", "✅ git init 完了"))
+    return logs
+
+def _rmtree_background(paths: list[Path]) -> None:
+    """paths をデーモンスレッドで削除する（画面の応答を待たせない。失敗は無視）"""
+    for p in paths:
+        threading.Thread(
+            target=shutil.rmtree, args=(p,), kwargs={"ignore_errors": True}, daemon=True
+        ).start()
+
+def _reinit_one(
+    repo_path: Path, repo_name: str, remote_url: str, branch_name: str, do_force_push: bool
+) -> list[tuple[str, str]]:
+    """1 リポジトリ分の .git 削除 → init → add → commit → branch -M →（remote add）→（push --force）（スレッドから呼ぶ）。"""
+    logs: list[tuple[str, str]] = []
+
+    # 事前に既存の origin を記録（入力が空なら再利用）
+    code_remote, out_remote, _ = git(["remote", "get-url", "origin"], cwd=repo_path)
+    existing_origin = out_remote.strip() if code_remote == 0 and out_remote else ""
+    use_remote = remote_url or existing_origin
+
+    # 1) .git を削除（完全に作り直す）
+    #    大きな履歴の rmtree は数秒かかるので、まず .git.trash.<ms> へ改名（同一 FS なら一瞬）し、
+    #    実際の削除はバックグラウンドのスレッドに任せる。前回の残骸があれば一緒に片付ける
+    try:
+        old_trash = [p for p in repo_path.glob(".git.trash.*") if p.is_dir()]
+        trash = repo_path / f".git.trash.{int(time.time() * 1000)}"
+        if (repo_path / ".git").exists():
+            os.replace(repo_path / ".git", trash)
+            old_trash.append(trash)
+        _rmtree_background(old_trash)
+        logs.append(("info", "`.git` を削除しました。"))
+    except Exception as e:
+        logs.append(("error", f".git の削除に失敗: {e}"))
+        return logs
+
+    # 2) git init → add → commit（現スナップショットを初期コミット化）
+    code1, out1, err1 = git(["init"], cwd=repo_path)
+    logs.append(("code", out1 or err1 or "(no output)"))
+
+    # 削除待ちの .git.trash.* を add -A で拾わないよう、新しい .git/info/exclude に足しておく
+    exclude = repo_path / ".git" / "info" / "exclude"
+    try:
+        exclude.parent.mkdir(parents=True, exist_ok=True)
+        with exclude.open("a", encoding="utf-8") as f:
+            f.write("\n.git.trash.*/\n")
+    except OSError:
+        pass
+
+    code2, out2, err2 = git(["add", "-A"], cwd=repo_path)
+    logs.append(("code", out2 or err2 or "(no output)"))
+
+    code3, out3, err3 = git(["commit", "-m", "Fresh start: current snapshot only"], cwd=repo_path)
+    logs.append(("code", out3 or err3 or "(no output)"))
+
+    # 3) ブランチ名を設定（main など）
+    code4, out4, err4 = git(["branch", "-M", branch_name], cwd=repo_path)
+    logs.append(("code", out4 or err4 or "(no output)"))
+
+    # 4) リモート設定（入力 > 既存origin の優先で）
+    if use_remote:
+        code5, out5, err5 = git(["remote", "add", "origin", use_remote], cwd=repo_path)
+        logs.append(("code", out5 or err5 or "(no output)"))
+    else:
+        logs.append(("warning", "リモートURLが未指定で既存originも見つかりません。pushはスキップします。"))
+
+    # 5) 必要なら --force で push
+    if do_force_push and use_remote:
+        code6, out6, err6 = git(["push", "-u", "--force", "origin", branch_name], cwd=repo_path)
+        logs.append(("code", out6 or err6 or "(no output)"))
+        if code6 == 0:
+            logs.append(("success", "✅ 強制 push 完了（リモートを新履歴で上書き）"))
+        else:
+            logs.append(("error", "❌ 強制 push に失敗しました。ログを確認してください。"))
+
+    # 6) 仕上げメッセージ
+    logs.append(("success", f"🧨 {repo_name}: 再初期化が完了しました。"))
+    if not do_force_push:
+        logs.append(("info", "必要であれば『リモートURLを設定 → --force で push』を実行してください。"))
+    return logs
+
+def _map_parallel(fn, targets: list) -> list:
+    """
+    fn(rec) を対象ごとにスレッドで並列実行し、結果を targets と同じ順で返す。
+    fn はネットワーク / ディスク待ちの git 操作で、st.* を呼ばないこと（表示は呼び出し側でまとめて行う）。
+    """
+    with ThreadPoolExecutor(max_workers=min(8, len(targets))) as ex:
+        return list(ex.map(fn, targets))
+
+def _render_logs(logs: list[tuple[str, str]]) -> None:
+    """_commit_one / _reset_one / _first_push_one / _init_one / _reinit_one が返したログを画面に出す"""
+    for kind, text in logs:
+        if kind == "code":
+            st.code(text, language="bash")
+        else:
+            getattr(st, kind)(text)  # info / success / warning / error / caption
+
+def _render_bulk_results(targets, results) -> None:
+    """git_many の結果を 1 つの st.code にまとめて出す（リポジトリ数に比例して要素を増やさない）"""
+    st.code(
+        "\n\n".join(
+            f"# ── {rec['name']}\n{out or err or '(no output)'}"
+            for rec, (code, out, err) in zip(targets, results)
+        ),
+        language="bash",
+    )
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_apps_git_dataframe(
+    project_root_str: str, fingerprint: tuple, estimate_size: bool = False
+) -> pd.DataFrame:
+    """
+    apps_git_dataframe をキャッシュ（選択やフォーム入力による rerun で全リポジトリに git を打ち直さない）。
+    fingerprint（各 .git/HEAD・index の mtime）が変われば、ページ外での commit 等も含めて取り直す。
+    このページの Git 操作の後と『🔁 ステータスを更新』で捨てる（次の rerun で再走査）。
+    """
+    return apps_git_dataframe(Path(project_root_str), estimate_size)
 
 # ------------------------------------------------------------
 # 5) ステータス再読み込み（サイドバーへ移動）
@@ -59,12 +294,26 @@ with st.sidebar:
     st.caption("Git の変更を再読み込みします。いつでも実行できます。")
 
     if st.button("🔁 ステータスを更新", key="btn_reload_status_sidebar"):
+        cached_apps_git_dataframe.clear()
+        st.rerun()
+
+    size_estimate = st.toggle(
+        "⚡ .git サイズを見積もりで表示（高速）",
+        value=False,
+        key="tgl_size_estimate",
+        help="オン: `git count-objects -v` のオブジェクト容量（index / logs 等は含まない）。オフ: `du` による正確な集計。",
+    )
+
+    st.caption(".git サイズは前回の集計を ~/.cache/command-station/gitsize.json に保存して再利用します。")
+    if st.button("🧹 .git サイズのキャッシュを消去", key="btn_clear_gitsize_sidebar"):
+        clear_git_size_cache()
+        cached_apps_git_dataframe.clear()
         st.rerun()
 
 # ------------------------------------------------------------
 # 1) プロジェクト走査＋Git情報取得（.gitサイズ表示対応版）
 # ------------------------------------------------------------
-df = apps_git_dataframe(PROJECT_ROOT)
+df = cached_apps_git_dataframe(str(PROJECT_ROOT), git_state_fingerprint(PROJECT_ROOT), size_estimate)
 
 # ------------------------------------------------------------
 # 初回表示時のみ fetch --all --prune を自動実行
@@ -72,29 +321,24 @@ df = apps_git_dataframe(PROJECT_ROOT)
 if not st.session_state.get(AUTO_FETCH_STATE_KEY, False):
     st.info("初回表示のため、GitHub側の最新情報を取得しています。")
 
-    fetch_logs = []
-
-    for _, rec in df.iterrows():
-        if not rec.get("is_repo", False):
-            continue
-
-        code, out, err = git("fetch --all --prune", cwd=rec["path"])
-        fetch_logs.append({
-            "name": rec.get("name", ""),
-            "path": str(rec.get("path", "")),
-            "code": code,
-            "output": out or err or "(no output)",
-        })
+    # リポジトリごとの fetch はネットワーク待ちなので並列に実行（結果の順序は一覧のまま）
+    # 行ごとの Series（iterrows）や dict を作らず、必要な列だけをリストで取り出す
+    # 0 件の df は列が float64 になり df[df["is_repo"]] が列選択になるので、loc + bool で行を絞る
+    repo_rows = df.loc[df["is_repo"].astype(bool)]
+    repo_names = repo_rows["name"].tolist()
+    repo_paths = repo_rows["path"].astype(str).tolist()
+    results = git_many(["fetch", "--all", "--prune"], repo_paths)
 
     st.session_state[AUTO_FETCH_STATE_KEY] = True
 
     with st.expander("初回自動 fetch の結果", expanded=False):
-        for item in fetch_logs:
-            st.markdown(f"**{item['name']}** — `{item['path']}`")
-            st.code(item["output"], language="bash")
+        for name, path, (code, out, err) in zip(repo_names, repo_paths, results):
+            st.markdown(f"**{name}** — `{path}`")
+            st.code(out or err or "(no output)", language="bash")
 
-    # fetch後の最新状態で再取得
-    df = apps_git_dataframe(PROJECT_ROOT)
+    # fetch後の最新状態で再取得（キャッシュを捨てる）
+    cached_apps_git_dataframe.clear()
+    df = cached_apps_git_dataframe(str(PROJECT_ROOT), git_state_fingerprint(PROJECT_ROOT), size_estimate)
 
 if df.empty:
     st.warning("対象フォルダが見つかりませんでした。`*_project` / `*_app` / `apps_portal` を確認してください。")
@@ -171,21 +415,19 @@ else:
 # 合計サイズのサマリ（任意）
 if "git_size_bytes" in df.columns:
     total_bytes = int(df["git_size_bytes"].sum())
-    # 人間可読の整形（apps側の関数に合わせた軽量版）
-    def _fmt(n: int) -> str:
-        size = float(n)
-        for unit in ["B", "KB", "MB", "GB", "TB"]:
-            if size < 1024.0 or unit == "TB":
-                return (f"{size:.0f} {unit}" if unit == "B" else f"{size:.2f} {unit}")
-            size /= 1024.0
-        return f"{size:.2f} TB"
-
-    st.caption(f"`.git` の合計サイズ：**{_fmt(total_bytes)}**（{total_bytes:,} bytes）")
-
-with st.expander("各リポジトリの `git status -sb` 出力（詳細）", expanded=False):
-    for _, rec in df.iterrows():
-        st.markdown(f"**{rec['name']}** — `{rec['path']}`  —  `.git`: {rec.get('git_size_human', '0 B')}")
-        st.code(rec["short_status"], language="bash")
+    # 人間可読の整形は一覧の .git サイズ列と同じ format_bytes（単位は bit_length から一発で決まる）
+    st.caption(f"`.git` の合計サイズ：**{format_bytes(total_bytes)}**（{total_bytes:,} bytes）")
+
+# 折りたたみ（expander）は閉じていても中身を毎回送るので、トグルが ON のときだけ描画する
+if st.toggle("各リポジトリの `git status -sb` 出力（詳細）を表示", value=False, key="tgl_status_detail"):
+    # リポジトリごとに markdown + code を並べず、見出し行付きで 1 つの st.code にまとめる
+    st.code(
+        "\n\n".join(
+            f"# ── {rec['name']} — {rec['path']}  (.git: {rec['git_size_human']})\n{rec['short_status']}"
+            for rec in df[df["is_repo"]].to_dict("records")
+        ),
+        language="bash",
+    )
 
 
 # ------------------------------------------------------------
@@ -215,38 +457,48 @@ with st.expander("💬 `git status -sb` の記号の意味（クリックで開
 st.divider()
 st.subheader("✅ 操作対象を選ぶ")
 
-sel = []
-for i, row in df.iterrows():
-    c1, c2 = st.columns([1, 7])
-    with c1:
-        # checked = st.checkbox("", key=f"sel_{i}")
-
-        # 修正案（ラベルは内部用、画面では非表示）
-        checked = st.checkbox(
-            "選択",  # 何でもよい（アクセシビリティ的には意味のある文字が望ましい）
-            key=f"sel_{i}",
-            label_visibility="collapsed",
-)
-    with c2:
-        git_badge = "🟢 Git" if row["is_repo"] else "⚪️ not Git"
-        st.write(
-            f"**{row['name']}** — `{row['path']}` | {git_badge} | "
-            f"ブランチ: `{row['branch'] or '-'}` | 変更: {row['dirty']} | "
-            f"ahead: {row['ahead']} | behind: {row['behind']}"
-        )
-    if checked:
-        sel.append(row)
+@st.fragment
+def _selection_fragment(df: pd.DataFrame) -> list[dict]:
+    """
+    選択表と選択中一覧だけを描画する fragment。チェックの ON/OFF ではこの中だけが再実行され、
+    走査結果の表や下の各操作 UI は描き直さない。
+    ページ全体の実行時（ボタン押下など）には選択行を dict のリストで返す。
+    """
+    # 行ごとの st.checkbox ではなく、選択列付きの表 1 つで選ばせる（ウィジェット数が行数に比例しない）
+    sel_table = pd.DataFrame({
+        "選択": False,
+        "名前": df["name"].astype(str),
+        "Git": df["is_repo"].map(lambda v: "🟢 Git" if v else "⚪️ not Git"),
+        "ブランチ": df["branch"].map(lambda b: b or "-"),
+        "変更": df["dirty"],
+        "ahead": df["ahead"],
+        "behind": df["behind"],
+        "パス": df["path"].astype(str),
+    })
+    edited = st.data_editor(
+        sel_table,
+        key="sel_editor",
+        hide_index=True,
+        width="stretch",
+        disabled=[c for c in sel_table.columns if c != "選択"],
+        column_config={"選択": st.column_config.CheckboxColumn("選択")},
+    )
+    # 選択行は dict のリストで持つ（iterrows の行ごとの Series 生成を避ける。以降は rec["path"] 等で参照）
+    sel = df[edited["選択"].to_numpy(dtype=bool)].to_dict("records")
 
-if not sel:
-    st.info("少なくとも1つのフォルダを選択してください。")
-else:
-    st.success(f"{len(sel)} 件選択中。")
+    if not sel:
+        st.info("少なくとも1つのフォルダを選択してください。")
+    else:
+        st.success(f"{len(sel)} 件選択中。")
+
+    if sel:
+        st.markdown("### 🧩 現在選択中の対象")
+        # 選択件数ぶんの要素を並べず、箇条書き 1 つにまとめて描画する
+        st.markdown("\n".join(f"- **{r['name']}** — `{r['path']}` （Git: {r['is_repo']}）" for r in sel))
 
-if sel:
-    st.markdown("### 🧩 現在選択中の対象")
-    for r in sel:
-        st.markdown(f"- **{r['name']}** — `{r['path']}` （Git: {r['is_repo']}）")
+    return sel
 
+sel = _selection_fragment(df)
 git_targets = [r for r in sel if r["is_repo"]]
 
 # ------------------------------------------------------------
@@ -267,21 +519,16 @@ if submitted:
     elif not commit_msg.strip():
         st.error("コミットメッセージが空です。")
     else:
-        for rec in git_targets:
+        # リポジトリごとの add → commit → push は互いに独立なので並列に実行し、表示は一覧の順で行う
+        results = _map_parallel(
+            lambda rec: _commit_one(rec["path"], add_pattern, commit_msg, do_push),
+            git_targets,
+        )
+        cached_apps_git_dataframe.clear()
+        for rec, logs in zip(git_targets, results):
             with st.expander(f"🧾 {rec['name']} の結果", expanded=False):
                 st.markdown(f"**{rec['name']}** — `{rec['path']}`")
-                code, out, err = git(f"add {add_pattern}", cwd=rec["path"])
-                st.code(out or err or "(no output)", language="bash")
-                code, out, err = git("diff --cached --name-only", cwd=rec["path"])
-                if not out.strip():
-                    st.info("ステージされた変更がありません。commit をスキップ。")
-                    continue
-                safe_msg = shlex.quote(commit_msg)
-                code, out, err = git(f"commit -m {safe_msg}", cwd=rec["path"])
-                st.code(out or err or "(no output)", language="bash")
-                if do_push:
-                    code, out, err = git("push", cwd=rec["path"])
-                    st.code(out or err or "(no output)", language="bash")
+                _render_logs(logs)
 
 # ------------------------------------------------------------
 # 4) 一括Git操作（fetch / pull / push）
@@ -350,10 +597,9 @@ with col[0]:
         if not git_targets:
             st.warning("⚠️ Git リポジトリが選択されていません。")
         else:
-            for rec in git_targets:
-                st.markdown(f"**{rec['name']}**")
-                code, out, err = git("fetch --all --prune", cwd=rec["path"])
-                st.code(out or err or "(no output)", language="bash")
+            results = git_many(["fetch", "--all", "--prune"], [rec["path"] for rec in git_targets])
+            cached_apps_git_dataframe.clear()
+            _render_bulk_results(git_targets, results)
 
 # ⬇️ pull
 with col[1]:
@@ -361,10 +607,13 @@ with col[1]:
         if not git_targets:
             st.warning("⚠️ Git リポジトリが選択されていません。")
         else:
-            for rec in git_targets:
-                st.markdown(f"**{rec['name']}**")
-                code, out, err = git("pull", cwd=rec["path"])
-                st.code(out or err or "(no output)", language="bash")
+            # サブモジュールがあれば、その fetch も GIT_JOBS 本並列に（無ければ影響なし）
+            results = git_many(
+                ["-c", f"submodule.fetchJobs={GIT_JOBS}", "pull"],
+                [rec["path"] for rec in git_targets],
+            )
+            cached_apps_git_dataframe.clear()
+            _render_bulk_results(git_targets, results)
 
 # ⬆️ push
 with col[2]:
@@ -372,10 +621,9 @@ with col[2]:
         if not git_targets:
             st.warning("⚠️ Git リポジトリが選択されていません。")
         else:
-            for rec in git_targets:
-                st.markdown(f"**{rec['name']}**")
-                code, out, err = git("push", cwd=rec["path"])
-                st.code(out or err or "(no output)", language="bash")
+            results = git_many(["push"], [rec["path"] for rec in git_targets])
+            cached_apps_git_dataframe.clear()
+            _render_bulk_results(git_targets, results)
 
 # ------------------------------------------------------------
 # 5) ステータス再読み込み
@@ -394,7 +642,13 @@ st.subheader("🧲 （🟢　最初のclone）git clone（新規取得：選択
 with st.form("clone_into_selected_form", clear_on_submit=False):
     st.caption("※ 保存先は **選択済みの1件** の `_app` ディレクトリです。フォルダ名は常に「.」で、**中身に** clone します。")
     clone_url2 = st.text_input("リポジトリURL", placeholder="https://github.com/user/repo.git", key="txt_clone_url2")
-    shallow2 = st.checkbox("--depth 1（浅い履歴）", value=False, key="chk_clone_depth2")
+    partial2 = st.checkbox(
+        "浅いクローン (partial: blob:none)",
+        value=False,
+        key="chk_clone_partial2",
+        help="履歴（コミット・ツリー）は全部取り、ファイルの中身は必要になった時点で取得します。",
+    )
+    shallow2 = st.checkbox("--depth 1（履歴も最新のみ。上級者向け）", value=False, key="chk_clone_depth2")
     submodules2 = st.checkbox("--recurse-submodules", value=False, key="chk_clone_sub2")
     run_clone2 = st.form_submit_button("🧲 選択先に clone（フォルダ名は「.」）")
 
@@ -420,18 +674,21 @@ if run_clone2:
                 )
             else:
                 extra = []
+                if partial2:
+                    extra += ["--filter=blob:none"]
                 if shallow2:
                     extra += ["--depth", "1", "--no-single-branch"]
                 if submodules2:
-                    extra += ["--recurse-submodules"]
+                    extra += ["--recurse-submodules", "--jobs", str(GIT_JOBS)]
+                    if shallow2:
+                        extra += ["--shallow-submodules"]
 
-                cmd = " ".join(["clone"] + extra + [shlex.quote(clone_url2), "."])
-                code, out, err = git(cmd, cwd=dest_dir)
-                st.code(out or err or "(no output)", language="bash")
+                code = _git_stream_code(["clone", *extra, clone_url2, "."], cwd=dest_dir)
+                cached_apps_git_dataframe.clear()
                 if code == 0:
                     st.success(f"✅ clone 完了: {clone_url2} → {dest_dir}（フォルダ名は『.』）")
                     # 念のためサブモジュールを最新化
-                    git("submodule update --init --recursive", cwd=dest_dir)
+                    git(["submodule", "update", "--init", "--recursive", "--jobs", str(GIT_JOBS)], cwd=dest_dir)
                 else:
                     st.error("❌ clone に失敗しました。ログを確認してください。")
 
@@ -528,24 +785,16 @@ if st.button("🚀 git init を実行（選択分）", key="btn_git_init", help=
     elif not confirm_init:
         st.error("実行を許可するチェックをオンにしてください。")
     else:
-        for rec in init_targets:
-            repo_path = Path(rec["path"])
-            st.markdown(f"**{rec['name']}** — `{repo_path}`")
-            code, out, err = git("init", cwd=repo_path)
-            st.code(out or err or "(no output)", language="bash")
-
-            # .gitignore 自動作成
-            gi = repo_path / ".gitignore"
-            if not gi.exists():
-                gi.write_text(".venv/\n__pycache__/\n.DS_Store\n")
-                st.info(".gitignore を自動作成しました。")
+        # init → .gitignore → remote → 初回 commit はリポジトリごとに独立なので並列に実行し、表示は選択順
+        results = _map_parallel(
+            lambda rec: _init_one(Path(rec["path"]), remote_url.strip(), auto_commit),
+            init_targets,
+        )
+        for rec, logs in zip(init_targets, results):
+            st.markdown(f"**{rec['name']}** — `{rec['path']}`")
+            _render_logs(logs)
 
-            if remote_url.strip():
-                git(f"remote add origin {shlex.quote(remote_url)}", cwd=repo_path)
-            if auto_commit:
-                git("add .", cwd=repo_path)
-                git("commit -m 'Initial commit'", cwd=repo_path)
-            st.success("✅ git init 完了")
+        cached_apps_git_dataframe.clear()
 
         st.info("必要に応じてリモート設定や push を行ってください。")
 
@@ -567,22 +816,17 @@ if st.button("初回 push を実行（選択分）", key="btn_first_push"):
     if not git_targets:
         st.error("Git リポジトリが選択されていません。")
     else:
-        for rec in git_targets:
+        # 上流確認 → push -u はリポジトリごとに独立なので並列に実行し、表示は選択順で行う
+        results = _map_parallel(
+            lambda rec: _first_push_one(
+                rec["path"], remote_name, "HEAD" if use_head else (rec["branch"] or "main")
+            ),
+            git_targets,
+        )
+        cached_apps_git_dataframe.clear()
+        for rec, logs in zip(git_targets, results):
             st.markdown(f"**{rec['name']}** — `{rec['path']}`")
-            code, _, _ = git("rev-parse --abbrev-ref --symbolic-full-name @{u}", cwd=rec["path"])
-            if code == 0:
-                st.info("すでに上流ブランチが設定されています。通常の push を利用してください。")
-                continue
-            else:
-                st.caption("上流ブランチが未設定 → push -u を実行します。")
-
-            if use_head:
-                cmd = f"push -u {shlex.quote(remote_name)} HEAD"
-            else:
-                current_branch = rec["branch"] or "main"
-                cmd = f"push -u {shlex.quote(remote_name)} {shlex.quote(current_branch)}"
-            code, out, err = git(cmd, cwd=rec["path"])
-            st.code(out or err or "(no output)", language="bash")
+            _render_logs(logs)
 
 
 
@@ -664,38 +908,21 @@ if st.button("💥 強制リセットを実行（選択分）", key="btn_force_r
     elif not really or confirm_text.strip().upper() != "RESET":
         st.error("確認が未完了です。『実行内容を理解した』にチェックし、`RESET` と入力してください。")
     else:
-        for rec in git_targets:
-            repo_path = rec["path"]
-            repo_name = rec["name"]
-            st.markdown(f"**{repo_name}** — `{repo_path}`")
-
-            # origin 設定確認
-            code_r, out_r, err_r = git("remote", cwd=repo_path)
-            if code_r != 0 or "origin" not in (out_r or ""):
-                st.error("origin が設定されていないためスキップ（`git remote add origin ...` が必要）")
-                continue
-
-            # fetch → reset --hard
-            code1, out1, err1 = git("fetch origin", cwd=repo_path)
-            st.code(out1 or err1 or "(no output)", language="bash")
-
-            branch = (rec.get("branch") or "main")
-            remote_ref = shlex.quote(f"origin/{branch}")
-            code2, out2, err2 = git(f"reset --hard {remote_ref}", cwd=repo_path)
-            st.code(out2 or err2 or "(no output)", language="bash")
-
-            if code1 == 0 and code2 == 0:
-                st.success(f"✅ {repo_name}: origin/{branch} に強制同期しました。")
-            else:
-                st.error(f"❌ {repo_name}: リセットに失敗しました。ログを確認してください。")
+        # fetch → reset はリポジトリごとに独立なので並列に実行し、表示は選択順で行う
+        results = _map_parallel(
+            lambda rec: _reset_one(rec["path"], rec["name"], rec.get("branch") or "main"),
+            git_targets,
+        )
+        cached_apps_git_dataframe.clear()
+        for rec, logs in zip(git_targets, results):
+            st.markdown(f"**{rec['name']}** — `{rec['path']}`")
+            _render_logs(logs)
 
         st.info("🔁 必要なら『ステータス再読み込み』ボタンで最新状態を反映してください。")
 
 # ------------------------------------------------------------
 # 10) 🧨 完全再初期化（履歴全消去・現スナップショットのみ）
 # ------------------------------------------------------------
-import shutil  # ← 追加
-
 thick_divider("#faad14", 3)
 st.subheader("🧨 完全再初期化（履歴全消去・現スナップショットのみ）")
 
@@ -766,57 +993,17 @@ if st.button("🧨 再初期化を実行（選択分）", key="btn_git_reinit"):
     elif not really_reinit or confirm_reinit.strip().upper() != "REINIT":
         st.error("確認が未完了です。『実行内容を理解した』にチェックし、`REINIT` と入力してください。")
     else:
-        for rec in git_targets:
-            repo_path = Path(rec["path"])
-            repo_name = rec["name"]
-            st.markdown(f"**{repo_name}** — `{repo_path}`")
-
-            # 事前に既存の origin を記録（入力が空なら再利用）
-            code_remote, out_remote, _ = git("remote get-url origin", cwd=repo_path)
-            existing_origin = out_remote.strip() if code_remote == 0 and out_remote else ""
-            use_remote = remote_url_input.strip() or existing_origin
-
-            # 1) .git を削除（完全に作り直す）
-            try:
-                shutil.rmtree(repo_path / ".git", ignore_errors=True)
-                st.info("`.git` を削除しました。")
-            except Exception as e:
-                st.error(f".git の削除に失敗: {e}")
-                continue
-
-            # 2) git init → add → commit（現スナップショットを初期コミット化）
-            code1, out1, err1 = git("init", cwd=repo_path)
-            st.code(out1 or err1 or "(no output)", language="bash")
-
-            code2, out2, err2 = git("add -A", cwd=repo_path)
-            st.code(out2 or err2 or "(no output)", language="bash")
-
-            code3, out3, err3 = git('commit -m "Fresh start: current snapshot only"', cwd=repo_path)
-            st.code(out3 or err3 or "(no output)", language="bash")
-
-            # 3) ブランチ名を設定（main など）
-            code4, out4, err4 = git(f"branch -M {shlex.quote(branch_name)}", cwd=repo_path)
-            st.code(out4 or err4 or "(no output)", language="bash")
-
-            # 4) リモート設定（入力 > 既存origin の優先で）
-            if use_remote:
-                code5, out5, err5 = git(f"remote add origin {shlex.quote(use_remote)}", cwd=repo_path)
-                st.code(out5 or err5 or "(no output)", language="bash")
-            else:
-                st.warning("リモートURLが未指定で既存originも見つかりません。pushはスキップします。")
-
-            # 5) 必要なら --force で push
-            if do_force_push and use_remote:
-                code6, out6, err6 = git(f"push -u --force origin {shlex.quote(branch_name)}", cwd=repo_path)
-                st.code(out6 or err6 or "(no output)", language="bash")
-                if code6 == 0:
-                    st.success("✅ 強制 push 完了（リモートを新履歴で上書き）")
-                else:
-                    st.error("❌ 強制 push に失敗しました。ログを確認してください。")
+        # 再初期化はリポジトリごとに独立（.git もリモートも別）なので並列に実行し、表示は選択順で行う
+        results = _map_parallel(
+            lambda rec: _reinit_one(
+                Path(rec["path"]), rec["name"], remote_url_input.strip(), branch_name, do_force_push
+            ),
+            git_targets,
+        )
+        for rec, logs in zip(git_targets, results):
+            st.markdown(f"**{rec['name']}** — `{rec['path']}`")
+            _render_logs(logs)
 
-            # 6) 仕上げメッセージ
-            st.success(f"🧨 {repo_name}: 再初期化が完了しました。")
-            if not do_force_push:
-                st.info("必要であれば『リモートURLを設定 → --force で push』を実行してください。")
+        cached_apps_git_dataframe.clear()
 
         st.info("🔁 必要なら『ステータス再読み込み』ボタンで最新状態を反映してください。")
@@ -5,6 +5,7 @@
 
 from __future__ import annotations
 from pathlib import Path
+import json
 import streamlit as st
 
 # 🔧 Nginx は util に委譲
@@ -21,6 +22,8 @@ from lib.nginx_utils import (
 # 🔧 アプリ操作は app_manager に委譲
 from lib.app_manager import (
     app_spec_list,
+    listening_port_map,
+    probe_specs,
     start_one_app,
     stop_one_app,
 )
@@ -40,6 +43,11 @@ def read_nginx_map() -> dict:
     with NGINX_TOML.open("rb") as f:
         return tomllib.load(f)
 
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_app_spec_list(settings_json: str, apps_map_json: str) -> list[dict]:
+    """app_spec_list を rerun ごとに作り直さないためのキャッシュ（設定内容の JSON をキーにする）"""
+    return app_spec_list(json.loads(settings_json), json.loads(apps_map_json))
+
 def open_browser_to_root():
     import webbrowser
     webbrowser.open_new_tab("http://localhost/")
@@ -63,7 +71,10 @@ index_root = Path(settings["locations"][loc]["index_root"])
 st.caption(f"環境: **{loc}**｜project_root: `{project_root}`｜index_root: `{index_root}`")
 
 # アプリ一覧（enabled=true）
-specs = app_spec_list(settings, apps_map)
+specs = cached_app_spec_list(
+    json.dumps(settings, sort_keys=True, default=str),
+    json.dumps(apps_map, sort_keys=True, default=str),
+)
 
 with st.expander("📋 起動対象アプリ（enabled=true）", expanded=True):
     if not specs:
@@ -115,8 +126,9 @@ with cB:
     st.markdown("**一括起動**")
     if st.button("🚀 全アプリ起動（enabled=true）", type="primary", width="stretch"):
         results = []
+        probes = probe_specs(specs)
         for sp in specs:
-            ok, msg = start_one_app(sp)
+            ok, msg = start_one_app(sp, probes.get(sp["name"]))
             results.append((ok, msg))
         if all(ok for ok, _ in results):
             st.success("全アプリ起動：OK ✅")
@@ -154,21 +166,14 @@ def _pid_alive(pid: int) -> bool:
     code, _, _ = _sh(["ps", "-p", str(pid), "-o", "pid="])
     return code == 0
 
-def _find_pid_by_port(port: int) -> list[int]:
-    # lsof -ti tcp:PORT → PIDの羅列（なければ空）
-    code, out, _ = _sh(["lsof", "-ti", f"tcp:{port}"])
-    if code != 0 or not out:
-        return []
-    try:
-        return [int(x) for x in out.splitlines() if x.strip().isdigit()]
-    except Exception:
-        return []
-
 def _cmdline(pid: int) -> str:
     # コマンドライン表示（情報用）
     code, out, _ = _sh(["ps", "-p", str(pid), "-o", "command="])
     return out if code == 0 else ""
 
+# LISTEN 中の port → PID を lsof 1 回でまとめて取得
+port_map = listening_port_map()
+
 rows = []
 for sp in specs:
     name = sp["name"]
@@ -196,7 +201,7 @@ for sp in specs:
 
     # 2) 見つからなければポートから逆引き
     if status != "RUNNING":
-        pids = _find_pid_by_port(port)
+        pids = port_map.get(port, [])
         if pids:
             pid = pids[0]
             if _pid_alive(pid):
@@ -211,25 +216,16 @@ for sp in specs:
         "app": f"/{name}",
         "port": port,
         "status": "🟢 RUNNING" if status == "RUNNING" else "⚪ STOPPED",
-        "pid": pid if pid else "-",
+        "pid": str(pid) if pid else "-",  # 数値と "-" を混在させない（Arrow 変換対策）
         "found_by": via,
         "open (proxy)": open_url,
         "open (direct)": direct_url,
         "command": cmd[:140] + ("…" if len(cmd) > 140 else ""),
     })
 
-import pandas as pd
-
-# 表示
+# 表示（数行の表なので DataFrame は作らず list[dict] をそのまま渡す）
 if rows:
-    # DataFrame化して Arrow エラー対策
-    df = pd.DataFrame(rows)
-
-    # pid列をすべて文字列化（Noneや数値混在の対策）
-    if "pid" in df.columns:
-        df["pid"] = df["pid"].astype(str)
-
-    st.dataframe(df, width="stretch")  # ← use_container_width → width に変更済み
+    st.dataframe(rows, width="stretch")  # ← use_container_width → width に変更済み
 else:
     st.info("表示するアプリがありません。")
 
@@ -238,7 +234,7 @@ with cR1:
     if st.button("🔄 再スキャン", width="stretch"):
         st.rerun()
 with cR2:
-    st.caption("検出順序: pidfile → port（lsof）。pidfile が壊れている場合は削除してください。")
+    st.caption("検出順序: pidfile → port（lsof, LISTEN のみ）。pidfile が壊れている場合は削除してください。")
 
 
 # ========== (4) 夕方の停止 ==========
@@ -258,6 +254,7 @@ with cT:
     if st.button("🛑 /command_station (:8505) 以外を全部停止", key="stop_all_except_cs", type="secondary", width="stretch"):
         results = []
         skipped  = []
+        probes = probe_specs(specs)
 
         for sp in specs:
             # 「command_station :8505」を停止対象から除外
@@ -265,7 +262,7 @@ with cT:
                 skipped.append(f"/{sp['name']} (:{sp['port']})")
                 continue
 
-            ok, msg = stop_one_app(sp)
+            ok, msg = stop_one_app(sp, probes.get(sp["name"]))
             results.append((ok, msg))
 
         if not results:
@@ -286,8 +283,9 @@ with cT:
     st.markdown("**一括停止（全て）**")
     if st.button("🛑 全アプリ停止（enabled=true）", key="stop_all_enabled", type="secondary", width="stretch"):
         results = []
+        probes = probe_specs(specs)
         for sp in specs:
-            ok, msg = stop_one_app(sp)
+            ok, msg = stop_one_app(sp, probes.get(sp["name"]))
             results.append((ok, msg))
         if all(ok for ok, _ in results):
             st.success("全アプリ停止：OK ✅")
@@ -1,10 +1,12 @@
 # pages/02_Git操作.py
 from __future__ import annotations
+from collections import deque
 from pathlib import Path
 import re
+import shlex
 import streamlit as st
 
-from lib.cmd_utils import git
+from lib.cmd_utils import git, git_meta_bulk, git_remote_first, git_stream, is_git_repo
 
 st.set_page_config(page_title="🔧 Git 操作", page_icon="🔧", layout="wide")
 st.title("🔧 Git 操作 — status / fetch / pull / add / commit / push / log / stash")
@@ -21,9 +23,42 @@ default_repo = st.session_state.get("git_repo_dir", str(Path.cwd()))
 repo_dir = st.text_input("リポジトリのパス", default_repo)
 st.session_state["git_repo_dir"] = repo_dir
 
-def is_git_repo(path: str) -> bool:
-    code, out, err = git("rev-parse --is-inside-work-tree", cwd=path)
-    return code == 0 and out.strip() == "true"
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_git_log(repo: str, n: int, grep: str) -> str:
+    """git log --oneline の結果（入力が同じ間は他ウィジェット操作の rerun で打ち直さない）"""
+    args = ["log", "--oneline", "-n", str(n)]
+    if grep:
+        args += [f"--grep={grep}", "--regexp-ignore-case"]
+    code, out, err = git(args, cwd=repo)
+    return out or err or "(no output)"
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_git_show_last(repo: str) -> str:
+    """最新コミットの git show（cached_git_log と同じく 30 秒キャッシュ）"""
+    code, out, err = git("show --name-status --stat -1", cwd=repo)
+    return out or err or "(no output)"
+
+def clear_log_cache() -> None:
+    """履歴が変わる操作（commit / pull）の後に呼ぶ"""
+    cached_git_log.clear()
+    cached_git_show_last.clear()
+
+def stream_to_code(args: str) -> int:
+    """
+    ネットワークを伴う操作は出力を 1 行ずつ表示する（終わるまで画面が固まらない）。
+    表示するのは末尾 200 行だけ（長い出力でも再描画とメモリが一定）。
+    """
+    placeholder = st.empty()
+    lines: deque[str] = deque(maxlen=200)
+
+    def _show(line: str) -> None:
+        lines.append(line)
+        placeholder.code("".join(lines), language="bash")
+
+    code = git_stream(args, _show, cwd=repo_dir)
+    if not lines:
+        placeholder.code("(no output)", language="bash")
+    return code
 
 # バリデーション
 if not Path(repo_dir).exists():
@@ -37,20 +72,19 @@ if not is_git_repo(repo_dir):
 # ------------------------------------------------------------
 # 概要: 現在ブランチ / リモート
 # ------------------------------------------------------------
+# ブランチと変更数は `status --porcelain=v2 --branch` 1 回から、リモートは .git/config から読む
+meta = git_meta_bulk(repo_dir)
+branch = meta["branch"] or "(不明)"
+changed = meta["changed"]
+
 col_a, col_b, col_c = st.columns(3)
 with col_a:
-    code, out, err = git("rev-parse --abbrev-ref HEAD", cwd=repo_dir)
-    branch = out if code == 0 else "(不明)"
     st.metric("ブランチ", branch)
 
 with col_b:
-    code, out, err = git("remote -v", cwd=repo_dir)
-    remote_line = out.splitlines()[0] if out else "(なし)"
-    st.metric("リモート", remote_line)
+    st.metric("リモート", git_remote_first(repo_dir) or "(なし)")
 
 with col_c:
-    code, out, err = git("status --porcelain=v1", cwd=repo_dir)
-    changed = len(out.splitlines()) if out else 0
     st.metric("変更ファイル数", changed)
 
 st.divider()
@@ -67,16 +101,14 @@ with c1:
         st.code(out or err or "(no output)", language="bash")
 with c2:
     if st.button("🌿 fetch --all --prune"):
-        code, out, err = git("fetch --all --prune", cwd=repo_dir)
-        st.code(out or err or "(no output)", language="bash")
+        stream_to_code("fetch --all --prune")
 with c3:
     if st.button("⬇️ pull"):
-        code, out, err = git("pull", cwd=repo_dir)
-        st.code(out or err or "(no output)", language="bash")
+        stream_to_code("pull")
+        clear_log_cache()
 with c4:
     if st.button("⬆️ push"):
-        code, out, err = git("push", cwd=repo_dir)
-        st.code(out or err or "(no output)", language="bash")
+        stream_to_code("push")
 
 # ------------------------------------------------------------
 # 2) add / commit / push
@@ -91,26 +123,26 @@ with st.form("commit_form", clear_on_submit=False):
 
 if submitted:
     # git add
-    code, out, err = git(f"add {add_pattern}", cwd=repo_dir)
+    code, out, err = git(["add", *shlex.split(add_pattern)], cwd=repo_dir)
     st.write("**git add** 結果:")
     st.code(out or err or "(no output)", language="bash")
 
-    # 空コミット防止のため差分有無をチェック
-    code, out, err = git("diff --cached --name-only", cwd=repo_dir)
-    if not out.strip():
-        st.warning("ステージされた変更がありません。コミットをスキップします。")
+    # git commit（事前の diff --cached は打たず、失敗したときだけステージ有無を確かめる）
+    if not commit_msg.strip():
+        st.error("コミットメッセージが空です。")
     else:
-        # git commit
-        if not commit_msg.strip():
-            st.error("コミットメッセージが空です。")
+        code, out, err = git(["commit", "-F", "-"], cwd=repo_dir, stdin=commit_msg.encode("utf-8"))
+        clear_log_cache()
+        if code != 0 and git("diff --cached --quiet", cwd=repo_dir)[0] == 0:
+            st.warning("ステージされた変更がありません。コミットをスキップします。")
         else:
-            safe_msg = shlex.quote(commit_msg)  # ← これで自動的に安全クォートされる
-            code, out, err = git(f"commit -m {safe_msg}", cwd=repo_dir)
             st.write("**git commit** 結果:")
             st.code(out or err or "(no output)", language="bash")
 
-            # git push (任意)
-            if do_push:
+            # git push (任意、コミットできたときだけ)
+            if do_push and code != 0:
+                st.error("git commit に失敗したため push をスキップしました。")
+            elif do_push:
                 code, out, err = git("push", cwd=repo_dir)
                 st.write("**git push** 結果:")
                 st.code(out or err or "(no output)", language="bash")
@@ -128,22 +160,11 @@ with log_cols[1]:
 with log_cols[2]:
     show_diff = st.checkbox("最新コミットの差分を表示", value=False)
 
-import shlex
-
-log_cmd = f"log --oneline -n {int(n)}"
-if grep.strip():
-    # 安全にクォート（例: grep="fix bug" → 'fix bug'）
-    safe_grep = shlex.quote(grep)
-    log_cmd += f" --grep={safe_grep} --regexp-ignore-case"
-
-
-code, out, err = git(log_cmd, cwd=repo_dir)
-st.code(out or err or "(no output)", language="bash")
+st.code(cached_git_log(repo_dir, int(n), grep.strip()), language="bash")
 
 if show_diff:
-    code, out, err = git("show --name-status --stat -1", cwd=repo_dir)
     st.subheader("最新コミットの差分（`git show -1`）")
-    st.code(out or err or "(no output)", language="bash")
+    st.code(cached_git_show_last(repo_dir), language="bash")
 
 # ------------------------------------------------------------
 # 4) 一時退避（stash）
@@ -153,11 +174,11 @@ st.subheader("④ スタッシュ")
 sc1, sc2, sc3 = st.columns(3)
 with sc1:
     if st.button("🧺 stash push"):
-        code, out, err = git('stash push -m "work-in-progress"', cwd=repo_dir)
+        code, out, err = git(["stash", "push", "-m", "work-in-progress"], cwd=repo_dir)
         st.code(out or err or "(no output)", language="bash")
 with sc2:
     if st.button("🧺 stash list"):
-        code, out, err = git("stash list", cwd=repo_dir)
+        code, out, err = git("stash list", cwd=repo_dir, readonly=True)
         st.code(out or err or "(no output)", language="bash")
 with sc3:
     if st.button("🧺 stash pop"):